@@ -13,7 +13,6 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     install_requires=[
         "colorama==0.4.6",
-        "prettytable==3.17.0",
         "ask_question==1.2.12",
         "colourise-output==1.1.6",
         "prompt-toolkit==3.0.52"
@@ -1,6 +1,8 @@
 # tests/test_tty_ov.py
+import io
 import os
 import sys
+import time
 import pytest
 import unittest
 import unittest.mock
@@ -9,6 +11,19 @@ from platform import system
 from tty_ov import TTY
 from tty_ov import ColouriseOutput
 from tty_ov import AskQuestion
+from prompt_toolkit.document import Document
+from prompt_toolkit.input import create_pipe_input
+from prompt_toolkit.output import DummyOutput
+from prompt_toolkit.application import create_app_session
+from tty_ov.tokenizer import tokenize_line, ParsedCommand
+from tty_ov.script_cache import ScriptPlanCache
+from tty_ov.completion import CommandTrie
+from tty_ov.output import OutputSink, OutputSpool, MemorySink, FileSink, NullSink
+from tty_ov.pager import LazyPager
+from tty_ov.history import CommandHistory, HistoryFile, PromptHistory
+from tty_ov.hl_ls import HLLs, PERMISSION_TABLE
+from tty_ov.ls_renderer import TableRenderer
+from tty_ov.listing_cache import ListingCache
 
 
 # print(f"(module help) = {help('modules')}")
@@ -87,6 +102,16 @@ def _list_to_dict(list_input: list, filler: any) -> dict:
     return result
 
 
+class _RecordingSink(OutputSink):
+    """ A sink remembering every write that it received """
+
+    def __init__(self, writes: list) -> None:
+        self.writes = writes
+
+    def write(self, text: str) -> None:
+        self.writes.append(text)
+
+
 def compile_hello_world_arguments(input_args: list[str]) -> str:
     """ Compile the arguments for the hello_world function """
     function_prompt = "Hello World !\n"
@@ -434,11 +459,9 @@ def test_multy_oneliner_commands_via_arguments(command_line_args, expected_resul
 def test_help() -> None:
     """ Test the help functions in order to see if some are miss programmed """
     TTYI = _initialise_class([""])
-    help_options = _list_dict_to_dict(TTYI.options)
-    help_result = _list_to_dict(list(help_options), SUCCESS)
+    help_options = TTYI.options.names()
+    help_result = _list_to_dict(help_options, SUCCESS)
     for i in help_options:
-        if i == "desc":
-            continue
         TTYI.process_complex_input(["help", i])
         help_result[i] = TTYI.current_tty_status
     status0 = _de_initialise_class(TTYI)
@@ -449,3 +472,916 @@ def test_help() -> None:
     assert ERROR not in help_result_list
     assert ERR not in help_result_list
     assert status0 == SUCCESS
+
+
+def test_command_registry_aliases() -> None:
+    """ Check that the aliases point to the same command and are removed with it """
+    TTYI = _initialise_class([])
+    help_function = TTYI.options.get_function("help")
+    aliases = TTYI.options.get_aliases("help")
+    alias_functions = [TTYI.options.get_function(i) for i in aliases]
+    ls_canonical = TTYI.options.resolve("dir")
+    removed = TTYI.options.remove_command("ls")
+    status = _de_initialise_class(TTYI)
+    assert aliases == TTYI.help_help_options[1:]
+    assert all(i == help_function for i in alias_functions)
+    assert ls_canonical == "ls"
+    assert removed == ["ls", "dir"]
+    assert "dir" not in TTYI.options
+    assert status == TTYI.success
+
+
+def test_import_functions_into_shell() -> None:
+    """ Import a custom function and call it through the prompt """
+    TTYI = _initialise_class([])
+    calls = []
+    response1 = TTYI.import_functions_into_shell(
+        [{"custom": calls.append, "desc": "A custom function"}]
+    )
+    TTYI.user_input = "custom a b"
+    TTYI.process_input()
+    description = TTYI.options.get_description("custom")
+    response2 = TTYI.remove_functions_from_shell([{"custom": calls.append}])
+    status = _de_initialise_class(TTYI)
+    assert response1 == TTYI.success
+    assert response2 == TTYI.success
+    assert calls == [["a", "b"]]
+    assert description == "A custom function"
+    assert status == TTYI.success
+
+
+def _flushed_value(tty: TTY, memory_sink: MemorySink) -> str:
+    """ Return the text that the tty wrote in a memory sink """
+    tty.flush_output()
+    return memory_sink.getvalue()
+
+
+def test_import_and_remove_plugin() -> None:
+    """ Hot-swap a plugin and remove it in a single batch """
+    TTYI = _initialise_class([])
+    memory_sink = MemorySink(0)
+    TTYI.set_output_sink(memory_sink)
+    baseline = len(TTYI.options.names())
+    first_version = {f"plugin_command_{i}": print for i in range(300)}
+    second_version = {"plugin_command_0": print, "plugin_command_new": print}
+    response1 = TTYI.import_plugin("sample", first_version)
+    first_summary = _flushed_value(TTYI, memory_sink)
+    memory_sink.clear()
+    loaded_first = len(TTYI.options.names())
+    response2 = TTYI.import_plugin("sample", second_version)
+    second_summary = _flushed_value(TTYI, memory_sink)
+    has_old_command = "plugin_command_1" in TTYI.options
+    has_new_command = "plugin_command_new" in TTYI.command_completer.trie
+    response3 = TTYI.remove_plugin("sample")
+    response4 = TTYI.remove_plugin("sample")
+    has_leftovers = len(
+        TTYI.command_completer.complete_command("plugin_command_")
+    ) > 0
+    status = _de_initialise_class(TTYI)
+    assert response1 == TTYI.success
+    assert response2 == TTYI.success
+    assert response3 == TTYI.success
+    assert response4 == TTYI.error
+    assert loaded_first == baseline + 300
+    assert first_summary == "Plugin 'sample': 300 function(s) added\n"
+    assert second_summary == "Plugin 'sample': 1 function(s) added, 1 replaced, 299 removed\n"
+    assert has_old_command is False
+    assert has_new_command is True
+    assert has_leftovers is False
+    assert status == TTYI.success
+
+
+def test_plugin_name_conflicts() -> None:
+    """ Check that a plugin does not silently replace a builtin (and it's aliases) """
+    TTYI = _initialise_class([])
+    memory_sink = MemorySink(0)
+    TTYI.set_output_sink(memory_sink)
+    refused_alias = TTYI.options.add_alias("ls", "pwd")
+    conflicts = TTYI.options.get_conflicts(["ls", "plugin_cat"])
+    response1 = TTYI.import_plugin("shadow", {"ls": print, "plugin_cat": print})
+    skipped_output = _flushed_value(TTYI, memory_sink)
+    ls_kept = TTYI.options.get_function("ls") == TTYI.bind_ls
+    memory_sink.clear()
+    response2 = TTYI.import_plugin(
+        "shadow",
+        {"ls": print, "plugin_cat": print},
+        replace=True
+    )
+    replaced_output = _flushed_value(TTYI, memory_sink)
+    dir_after_replace = "dir" in TTYI.options
+    memory_sink.clear()
+    response3 = TTYI.remove_functions_from_shell(
+        [{"plugin_cat": print}, {"plugin_cat": print}]
+    )
+    removed_output = _flushed_value(TTYI, memory_sink)
+    status = _de_initialise_class(TTYI)
+    assert refused_alias is False
+    assert conflicts == ["ls", "dir"]
+    assert response1 == TTYI.success
+    assert "Skipped name(s) ['ls']" in skipped_output
+    assert ls_kept is True
+    assert response2 == TTYI.success
+    assert "Replaced name(s) ['ls', 'dir']" in replaced_output
+    assert dir_after_replace is False
+    assert response3 == TTYI.success
+    assert "Removed 1 function(s)" in removed_output
+    assert status == TTYI.success
+
+
+def test_command_completion() -> None:
+    """ Check that the completer follows the registry without rebuilding it's trie """
+    TTYI = _initialise_class([])
+    with unittest.mock.patch(
+        "tty_ov.completion.CommandTrie",
+        wraps=CommandTrie
+    ) as trie_class:
+        TTYI.import_plugin(
+            "bulk",
+            {f"bulk_{i:05d}": print for i in range(5000)}
+        )
+        completions = [
+            i.text for i in TTYI.command_completer.get_completions(
+                Document("hello_world a @# he"), None
+            )
+        ]
+        bulk = TTYI.command_completer.complete_command("bulk_04")
+        TTYI.remove_plugin("bulk")
+        bulk_after_removal = TTYI.command_completer.complete_command("bulk_")
+        rebuilds = trie_class.call_count
+    status = _de_initialise_class(TTYI)
+    assert completions == ["hello_world", "help"]
+    assert bulk[0] == "bulk_04000"
+    assert len(bulk) == 200
+    assert rebuilds == 0
+    assert bulk_after_removal == []
+    assert status == TTYI.success
+
+
+def test_path_completion(tmp_path) -> None:
+    """ Check that the arguments of the file commands are completed from a cached listing """
+    TTYI = _initialise_class([])
+    for name in ("alpha", "alpine", "beta"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "almond.txt").write_text("")
+    listing_cache = TTYI.command_completer.path_completer.listing_cache
+    completions1 = [
+        i.text for i in TTYI.command_completer.get_completions(
+            Document(f"cd {tmp_path}/al"), None
+        )
+    ]
+    cached_listing = listing_cache.listings[str(tmp_path)]
+    completions2 = [
+        i.text for i in TTYI.command_completer.get_completions(
+            Document(f"dir {tmp_path}/alp"), None
+        )
+    ]
+    is_cache_reused = listing_cache.listings[str(tmp_path)] is cached_listing
+    completions3 = [
+        i.text for i in TTYI.command_completer.get_completions(
+            Document(f"hello_world {tmp_path}/al"), None
+        )
+    ]
+    status = _de_initialise_class(TTYI)
+    assert completions1 == ["almond.txt", "alpha/", "alpine/"]
+    assert completions2 == ["alpha/", "alpine/"]
+    assert is_cache_reused is True
+    assert completions3 == []
+    assert status == TTYI.success
+
+
+@pytest.mark.parametrize(
+    "line, expected_result",
+    [
+        (
+            "hello_world a  b",
+            [("hello_world", ("a", "b"))]
+        ),
+        (
+            "hello_world \"a b\" 'c d' -- comment @# @# exit",
+            [("hello_world", ("a b", "c d")), ("exit", ())]
+        ),
+        (
+            "hello_world \"@#\" @#@# \"--\" @# version",
+            [("hello_world", ("@#", "@#@#", "--")), ("version", ())]
+        ),
+        (
+            "-- only a comment",
+            []
+        )
+    ]
+)
+def test_tokenize_line(line, expected_result) -> None:
+    """ Check the split of a line into commands """
+    response = tokenize_line(line, "@#", "--")
+    assert [(i.command, i.args) for i in response] == expected_result
+
+
+def test_process_input_with_seperators() -> None:
+    """ Run several commands typed on a single line """
+    TTYI = _initialise_class([])
+    calls = []
+    TTYI.import_functions_into_shell([{"custom": calls.append}])
+    TTYI.user_input = "custom \"a b\" c @# CUSTOM d -- e"
+    TTYI.process_input()
+    history = list(TTYI.history)
+    status = _de_initialise_class(TTYI)
+    assert calls == [["a b", "c"], ["d"]]
+    assert history == ["custom \"a b\" c @# CUSTOM d -- e"]
+    assert status == TTYI.success
+
+
+def test_parse_cache() -> None:
+    """ Check that repeated lines are served from the parse cache and that changing a token invalidates it """
+    TTYI = _initialise_class([])
+    calls = []
+    TTYI.import_functions_into_shell([{"custom": calls.append}])
+    for _ in range(3):
+        TTYI.user_input = "custom a -- b"
+        TTYI.process_input()
+    hit_rate = TTYI.parse_cache.hit_rate()
+    response1 = TTYI.update_comment_token(["#"])
+    cached_lines = len(TTYI.parse_cache)
+    TTYI.user_input = "custom a -- b"
+    TTYI.process_input()
+    response2 = TTYI.parse_cache_statistics([])
+    status = _de_initialise_class(TTYI)
+    assert hit_rate == 2 / 3
+    assert response1 == TTYI.success
+    assert cached_lines == 0
+    assert calls == [["a"], ["a"], ["a"], ["a", "--", "b"]]
+    assert response2 == TTYI.success
+    assert status == TTYI.success
+
+
+def test_process_stream_input() -> None:
+    """ Run piped commands line by line and stop reading once the session is left """
+    TTYI = _initialise_class([])
+    calls = []
+    TTYI.import_functions_into_shell([{"custom": calls.append}])
+    TTYI.pipe_max_line_length = 64
+    stream = io.StringIO(
+        "custom a\n"
+        "\"custom b c\"\r\n"
+        "\"custom\" \"p q\"\n"
+        f"custom {'x' * 100}\n"
+        "custom d @# exit\n"
+        "custom never_run\n"
+    )
+    response = TTYI.process_stream_input(stream)
+    history = list(TTYI.history)
+    status = _de_initialise_class(TTYI)
+    assert calls == [["a"], ["b", "c"], ["p q"], ["d"]]
+    assert response == TTYI.error
+    assert history == []
+    assert status == TTYI.success
+
+
+def test_source_script(tmp_path) -> None:
+    """ Run a script twice, the second run must come from the plan cache """
+    TTYI = _initialise_class([])
+    TTYI.script_cache.cache_directory = str(tmp_path / "plans")
+    calls = []
+    TTYI.import_functions_into_shell([{"custom": calls.append}])
+    script = tmp_path / "script.tty"
+    script.write_text("custom a -- comment\n\ncustom \"b c\" @# custom d\n")
+    response1 = TTYI.source([str(script)])
+    TTYI.process_complex_input([".", str(script)])
+    response3 = TTYI.source([str(tmp_path / "missing.tty")])
+    hits = TTYI.script_cache.hits
+    status = _de_initialise_class(TTYI)
+    assert response1 == TTYI.success
+    assert response3 == TTYI.error
+    assert calls == [["a"], ["b c"], ["d"]] * 2
+    assert hits == 1
+    assert status == TTYI.success
+
+
+def test_source_cycle(tmp_path) -> None:
+    """ A script sourcing itself (directly or through another script) is refused instead of recursing forever """
+    TTYI = _initialise_class([])
+    TTYI.script_cache.cache_directory = str(tmp_path / "plans")
+    first = tmp_path / "first.tty"
+    second = tmp_path / "second.tty"
+    first.write_text(f"source {second}\n")
+    second.write_text(f"hello_world @# source {first}\n")
+    result = TTYI.execute(f"source {first}")
+    self_result = TTYI.execute(f"source {second} @# source {second}")
+    status = _de_initialise_class(TTYI)
+    assert result.status == TTYI.error
+    assert result.stdout.count("Hello World !") == 1
+    assert "already running" in result.stdout
+    assert self_result.stdout.count("Hello World !") == 2
+    assert TTYI.running_scripts == set()
+    assert status == TTYI.success
+
+
+def test_script_plan_cache_limits(tmp_path) -> None:
+    """ Reject the malformed plans and keep the number of cached plans bounded """
+    cache = ScriptPlanCache(str(tmp_path), max_plans=2)
+    malformed = []
+    for index, content in enumerate(("[1]", "[[\"ls\"]]", "[[\"ls\", [1]]]", "{}")):
+        (tmp_path / f"bad{index}.json").write_text(content)
+        malformed.append(cache.load_plan(f"bad{index}"))
+    cache.clear()
+    for index in range(3):
+        cache.save_plan(f"plan{index}", [ParsedCommand("ls", (str(index),))])
+        os.utime(cache.get_plan_path(f"plan{index}"), (index, index))
+    remaining = sorted(os.listdir(tmp_path))
+    plan = cache.load_plan("plan2")
+    assert malformed == [None] * 4
+    assert remaining == ["plan1.json", "plan2.json"]
+    assert plan == [ParsedCommand("ls", ("2",))]
+
+
+def test_execute() -> None:
+    """ Run commands without a terminal and check the returned results """
+    TTYI = _initialise_class([])
+    result1 = TTYI.execute("hello_world a \"b c\"")
+    result2 = TTYI.execute("not_a_command")
+    result3 = TTYI.execute(f"ls {os.path.dirname(__file__)}/does_not_exist")
+    history = list(TTYI.history)
+    status = _de_initialise_class(TTYI)
+    assert result1.status == TTYI.success
+    assert result1.stdout == "Hello World !\n0: 'a'\n1: 'b c'\n"
+    assert result1.stderr == ""
+    assert result1.duration >= 0
+    assert result2.status == TTYI.err
+    assert result2.stdout == "Invalid option: not_a_command\n"
+    assert result3.status == TTYI.error
+    assert "No such file or directory" in result3.stderr
+    assert history == []
+    assert status == TTYI.success
+
+
+def test_buffered_output() -> None:
+    """ Check that the fragments displayed by a command are written in a single call """
+    TTYI = _initialise_class(["--no-colour"])
+    writes = []
+    TTYI.set_output_sink(_RecordingSink(writes))
+    TTYI.user_input = "env++"
+    TTYI.process_input()
+    env_writes = len(writes)
+    TTYI.pwd([])
+    status = _de_initialise_class(TTYI)
+    assert env_writes == 1
+    assert writes[0].count("\n") >= len(os.environ)
+    assert writes[1] == f"{os.getcwd()}\n"
+    assert status == TTYI.success
+
+
+def test_colour_escapes() -> None:
+    """ Check the precomputed escape sequences and the monochrome output when the output is not a terminal """
+    TTYI = _initialise_class([])
+    writes = []
+    TTYI.set_output_sink(_RecordingSink(writes))
+    TTYI.output_is_tty = True
+    TTYI.print_on_tty(TTYI.error_colour, "coloured")
+    TTYI.output_is_tty = False
+    TTYI.print_on_tty(TTYI.error_colour, "plain")
+    escape = TTYI.colour_escapes[CONSTANTS["error"]]
+    status = _de_initialise_class(TTYI)
+    assert escape == COLOUR_LIB.unix_colour_pallet[CONSTANTS["error"]]
+    assert writes == [f"{escape}coloured", "plain"]
+    assert status == TTYI.success
+
+
+def test_output_sinks(tmp_path) -> None:
+    """ Run commands (ls included) against the memory, file and null sinks """
+    memory_sink = MemorySink(64)
+    TTYI = TTY(
+        ERR,
+        ERROR,
+        SUCCESS,
+        COLOUR_LIB,
+        ASK_QUESTION,
+        CONSTANTS,
+        True,
+        memory_sink
+    )
+    TTYI.load_basics()
+    TTYI.execute("hello_world")
+    TTYI.user_input = f"ls {tmp_path} @# hello_world {'x' * 100}"
+    TTYI.process_input()
+    memory_content = memory_sink.getvalue()
+    file_path = tmp_path / "output.log"
+    file_sink = FileSink(str(file_path))
+    TTYI.set_output_sink(file_sink)
+    TTYI.user_input = "hello_world a"
+    TTYI.process_input()
+    file_sink.close()
+    TTYI.set_output_sink(NullSink())
+    TTYI.user_input = "env"
+    TTYI.process_input()
+    status = _de_initialise_class(TTYI)
+    with pytest.raises(TypeError):
+        type("IncompleteSink", (OutputSink,), {})()
+    assert len(memory_content) == 64
+    assert memory_content.endswith("x" * 56 + "'\n")
+    assert "\x1b" not in memory_content
+    assert file_path.read_text() == "Hello World !\n0: 'a'\n"
+    assert status == TTYI.success
+
+
+def test_output_spool_and_pager() -> None:
+    """ Display an output until the threshold, spool the rest to a temporary file and browse it through the pager """
+    terminal = MemorySink(0)
+    small_spool = OutputSpool(terminal, 100)
+    small_spool.write("small\n")
+    small_spool.close()
+    spool = OutputSpool(terminal, 70)
+    for i in range(50):
+        spool.write(f"line {i}\n")
+    spool.flush()
+    answers = iter(["", "b", "38", "q"])
+    prompts = []
+
+    def _answer(prompt: str) -> str:
+        prompts.append(prompt)
+        return next(answers)
+    pager = LazyPager(spool.file, MemorySink(0), _answer, 10, 4)
+    pager.run()
+    pages = pager.sink.getvalue()
+    pager = LazyPager(spool.file, MemorySink(0), _answer, 10, 4)
+    pager.open()
+    total_lines = pager.count_lines()
+    last_lines = pager.get_lines(37, 10)
+    pager.close()
+    spool.close()
+    assert terminal.getvalue() == "small\n" + "".join(f"line {i}\n" for i in range(10))
+    assert small_spool.is_spooled() is False
+    assert pages.count("line 10\n") == 2
+    assert pages.startswith("line 10\n") and pages.endswith("line 49\n")
+    assert "line 20\n" in pages and "line 40\n" in pages
+    assert "line 30\n" not in pages
+    assert prompts[0] == "-- lines 1-10 (Enter: next, b: back, g/G: top/end, <n>: line, q: quit) --"
+    assert len(prompts) == 3
+    assert total_lines == 40
+    assert last_lines == ["line 47\n", "line 48\n", "line 49\n"]
+
+
+def test_output_spool_streams_to_terminal(tmp_path) -> None:
+    """ Check that the output of a command reaches the terminal while it runs when the spool is active """
+    for i in range(600):
+        (tmp_path / f"file_{i:04d}").write_text("")
+    writes = []
+    terminal = _RecordingSink(writes)
+    terminal.isatty = lambda: True
+    TTYI = _initialise_class([])
+    TTYI.set_output_sink(terminal)
+    writes_during_command = []
+
+    def _probe(args: list) -> int:
+        TTYI.bind_ls([str(tmp_path)])
+        writes_during_command.append(len(writes))
+        return TTYI.success
+    TTYI.import_functions_into_shell([{"probe": _probe}])
+    writes.clear()
+    with unittest.mock.patch("sys.stdin.isatty", return_value=True):
+        TTYI.user_input = "probe"
+        TTYI.process_input()
+        spool_used = TTYI.can_use_pager()
+    status = _de_initialise_class(TTYI)
+    assert spool_used is True
+    assert writes_during_command[0] > 1
+    assert "file_0599" in "".join(writes)
+    assert status == TTYI.success
+
+
+def test_history_ring_buffer() -> None:
+    """ Check that the history keeps only the newest commands and the windowed views """
+    history = CommandHistory(3)
+    dropped = [history.append(f"command {i}") for i in range(5)]
+    TTYI = _initialise_class([])
+    TTYI.history.resize(2)
+    for command in ("hello_world", "pwd", "version"):
+        TTYI.user_input = command
+        TTYI.process_input()
+    writes = []
+    TTYI.set_output_sink(_RecordingSink(writes))
+    TTYI.output_is_tty = False
+    window_status = TTYI.show_history(["-n", "1"])
+    window = "".join(writes)
+    writes.clear()
+    range_status = TTYI.show_history(["0", "5"])
+    full_range = "".join(writes)
+    invalid_status = TTYI.show_history(["-n"])
+    status = _de_initialise_class(TTYI)
+    assert list(history) == ["command 2", "command 3", "command 4"]
+    assert dropped == [None, None, None, 0, 1]
+    assert history[-1] == "command 4" and history.get(1) is None
+    assert history.get_range(3, 10) == [(3, "command 3"), (4, "command 4")]
+    assert history.tail(1) == [(4, "command 4")]
+    assert window == "The history of the commands:\n2: 'version'\n"
+    assert full_range == "The history of the commands:\n1: 'pwd'\n2: 'version'\n"
+    assert window_status == TTYI.success
+    assert range_status == TTYI.success
+    assert invalid_status == TTYI.error
+    assert status == TTYI.success
+
+
+def test_history_file(tmp_path) -> None:
+    """ Save the history in a file and load the end of it in a new shell """
+    history_path = str(tmp_path / "history")
+    TTYI = TTY(ERR, ERROR, SUCCESS, COLOUR_LIB, ASK_QUESTION, CONSTANTS, True, NullSink(), 3, history_path)
+    TTYI.load_basics()
+    for command in ("hello_world", "pwd", "hello_world 'a\\nb'", "version"):
+        TTYI.user_input = command
+        TTYI.process_input()
+    status = _de_initialise_class(TTYI)
+    with open(history_path, "r", encoding="utf-8") as file:
+        line_count = len(file.readlines())
+    reloaded = TTY(ERR, ERROR, SUCCESS, COLOUR_LIB, ASK_QUESTION, CONSTANTS, True, NullSink(), 2, history_path)
+    reloaded_history = list(reloaded.history)
+    prompt_history = PromptHistory(reloaded.history)
+    prompt_strings = list(prompt_history.load_history_strings())
+    history_file = HistoryFile(str(tmp_path / "missing"))
+    assert line_count == 4
+    assert reloaded_history == ["hello_world 'a\\nb'", "version"]
+    assert prompt_strings == ["version", "hello_world 'a\\nb'"]
+    assert prompt_history.get_strings() is reloaded.history
+    assert list(prompt_history.get_strings()) == reloaded_history
+    assert history_file.load_tail(10) == []
+    assert status == TTYI.success
+
+
+def test_history_up_arrow() -> None:
+    """ Press the up arrow (and ctrl+r) in the prompt and check that the previous commands are recalled """
+    TTYI = _initialise_class([])
+    for command in ("pwd", "version"):
+        TTYI.user_input = command
+        TTYI.process_input()
+    answers = []
+    messages = []
+    with create_pipe_input() as pipe_input:
+        with create_app_session(input=pipe_input, output=DummyOutput()):
+            TTYI.create_key_prompt_bindings()
+            pipe_input.send_text("\x1b[A\r")
+            answers.append(TTYI.user_session.prompt())
+            pipe_input.send_text("\x1b[A\x1b[A\r")
+            answers.append(TTYI.user_session.prompt())
+            TTYI.user_input = "hello_world pw"
+            TTYI.process_input()
+            for keys in ("\x12pw\r", "\x12pw\x12\r", "x\x12ver\x07\r", "\x12ve\x1b[Ds\r"):
+                pipe_input.send_text(keys)
+                answers.append(TTYI.process_key_inputs())
+                messages.append(TTYI.get_history_search_message())
+            TTYI.start_history_search()
+            TTYI.update_history_search("missing")
+            messages.append(TTYI.get_history_search_message())
+    status = _de_initialise_class(TTYI)
+    assert answers == ["version", "pwd", "hello_world pw", "pwd", "x", "versiosn"]
+    assert messages == ["", "", "", "", "(failing reverse-i-search)`missing': "]
+    assert status == TTYI.success
+
+
+def test_history_search() -> None:
+    """ Search the history through the trigram index (evicted lines must not be found) """
+    history = CommandHistory(20000)
+    for i in range(40000):
+        history.append(f"echo value_{i} @# pwd")
+    with unittest.mock.patch.object(history, "get", wraps=history.get) as get:
+        newest = history.search("value_3999")
+        older = history.search("value_3999", newest[0])
+        missing = history.search("value_99999 ")
+        evicted = history.search("value_1999 ")
+        indexed_comparisons = get.call_count
+        short = history.search("85", 39990)
+    TTYI = _initialise_class([])
+    for command in ("hello_world first", "pwd", "hello_world second"):
+        TTYI.user_input = command
+        TTYI.process_input()
+    TTYI.start_history_search("typed")
+    first_match = TTYI.update_history_search("hello")
+    second_match = TTYI.search_older_history()
+    third_match = TTYI.search_older_history()
+    accepted = TTYI.stop_history_search()
+    TTYI.start_history_search("typed")
+    TTYI.update_history_search("pwd")
+    cancelled = TTYI.stop_history_search(False)
+    status = _de_initialise_class(TTYI)
+    assert newest == (39999, "echo value_39999 @# pwd")
+    assert older == (39998, "echo value_39998 @# pwd")
+    assert missing is None
+    assert evicted is None
+    assert short == (39985, "echo value_39985 @# pwd")
+    assert len(history.search_index.candidates("value_25")) == 1000
+    assert indexed_comparisons == 2
+    assert first_match == "hello_world second"
+    assert second_match == "hello_world first"
+    assert third_match is None
+    assert accepted == "hello_world first"
+    assert cancelled == "typed"
+    assert status == TTYI.success
+
+
+def _create_listing_directory(path) -> None:
+    """ Create a directory containing a file, a sub directory and a broken symbolic link """
+    (path / "b_file.txt").write_text("content")
+    (path / "a_directory").mkdir()
+    if system() != "Windows":
+        os.symlink(str(path / "missing"), str(path / "c_link"))
+
+
+def test_ls_scandir(tmp_path) -> None:
+    """ List a directory that is not the working directory without stating the entries a second time """
+    _create_listing_directory(tmp_path)
+    sink = MemorySink(0)
+    ls_instance = HLLs(SUCCESS, ERROR, sink)
+    with unittest.mock.patch("os.lstat", side_effect=os.lstat) as lstat_mock:
+        status = ls_instance.ls(str(tmp_path))
+    content = sink.getvalue()
+    file_status = ls_instance.ls(str(tmp_path / "b_file.txt"))
+    missing_status = ls_instance.ls(str(tmp_path / "missing"))
+    assert status == SUCCESS
+    assert lstat_mock.call_count == 0
+    assert content.index("a_directory") < content.index("b_file.txt")
+    if system() != "Windows":
+        assert f"c_link -> {tmp_path / 'missing'}" in content
+    assert file_status == SUCCESS
+    assert missing_status == ERROR
+    assert "No such file or directory" in sink.get_errors()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="pwd/grp are not available on Windows")
+def test_ls_name_cache(tmp_path) -> None:
+    """ Check that the owner of the files is only looked up once per listing """
+    import pwd
+    for index in range(20):
+        (tmp_path / f"file_{index}").write_text("")
+    ls_instance = HLLs(SUCCESS, ERROR, NullSink())
+    with unittest.mock.patch("pwd.getpwuid", side_effect=pwd.getpwuid) as getpwuid_mock:
+        status = ls_instance.ls(str(tmp_path))
+        ls_instance.ls(str(tmp_path))
+    expiring_instance = HLLs(SUCCESS, ERROR, NullSink(), 0)
+    expiring_instance.get_user_info(os.getuid())
+    with unittest.mock.patch("pwd.getpwuid", side_effect=KeyError) as failing_mock:
+        unknown_name = expiring_instance.get_user_info(os.getuid())
+    preloaded = HLLs(SUCCESS, ERROR, NullSink())
+    loaded = preloaded.preload_names()
+    assert status == SUCCESS
+    assert getpwuid_mock.call_count == 1
+    assert failing_mock.call_count == 1
+    assert unknown_name == str(os.getuid())
+    assert loaded > 0
+    assert preloaded.get_user_info(0) == pwd.getpwuid(0).pw_name
+
+
+def test_ls_streaming_renderer(tmp_path) -> None:
+    """ Check that the table is written before it is complete and the one name per line mode """
+    _create_listing_directory(tmp_path)
+    writes = []
+    table = TableRenderer(_RecordingSink(writes), ["Name", "Size"], ["l", "r"], 2, 2)
+    table.add_row(("a", "1"))
+    before_sample = len(writes)
+    table.add_row(("bb", "22"))
+    after_sample = len(writes)
+    table.add_row(("a_longer_name", "3"))
+    table.add_row(("d", "4"))
+    table.finish()
+    TTYI = _initialise_class([])
+    memory_sink = MemorySink(0)
+    TTYI.set_output_sink(memory_sink)
+    one_per_line_status = TTYI.bind_ls(["-1", str(tmp_path)])
+    names = memory_sink.getvalue()
+    invalid_status = TTYI.bind_ls(["--invalid"])
+    status = _de_initialise_class(TTYI)
+    assert before_sample == 0
+    assert after_sample == 1
+    assert "".join(writes) == (
+        "+------+------+\n"
+        "| Name | Size |\n"
+        "+------+------+\n"
+        "| a    |    1 |\n"
+        "| bb   |   22 |\n"
+        "| a_longer_name |    3 |\n"
+        "| d    |    4 |\n"
+        "+------+------+\n"
+    )
+    expected_names = "a_directory\nb_file.txt\n"
+    if system() != "Windows":
+        expected_names += "c_link\n"
+    assert names == expected_names
+    assert one_per_line_status == TTYI.success
+    assert invalid_status == TTYI.error
+    assert status == TTYI.success
+
+
+def test_ls_parallel_stat(tmp_path) -> None:
+    """ Check that the listing is the same (and in the same order) when the entries are stated by a thread pool """
+    for index in range(100):
+        (tmp_path / f"file_{index:03d}").write_text("x" * index)
+    sequential_sink = MemorySink(0)
+    parallel_sink = MemorySink(0)
+    sequential_status = HLLs(SUCCESS, ERROR, sequential_sink).ls(str(tmp_path))
+    ls_instance = HLLs(SUCCESS, ERROR, parallel_sink, stat_workers=8)
+    parallel_status = ls_instance.ls(str(tmp_path))
+    options, paths = ls_instance.parse_options(["-j", "4", str(tmp_path)])
+    with pytest.raises(ValueError):
+        ls_instance.parse_options(["--jobs"])
+    assert sequential_status == SUCCESS
+    assert parallel_status == SUCCESS
+    assert parallel_sink.getvalue() == sequential_sink.getvalue()
+    assert options.stat_workers == 4
+    assert paths == [str(tmp_path)]
+
+
+def test_ls_precomputed_formats(tmp_path) -> None:
+    """ Check the permission table, the time cache and that the locale is only set once """
+    import stat
+    _create_listing_directory(tmp_path)
+    ls_instance = HLLs(SUCCESS, ERROR, NullSink())
+    with unittest.mock.patch("locale.setlocale") as setlocale_mock:
+        ls_instance.ls(str(tmp_path))
+        ls_instance.ls(str(tmp_path))
+    ls_instance = HLLs(SUCCESS, ERROR, NullSink())
+    now = 10000000
+    first = ls_instance.format_time(9999961.5, now, now - 100)
+    second = ls_instance.format_time(9999999, now, now - 100)
+    old = ls_instance.format_time(0, now, now - 100)
+    assert setlocale_mock.call_count == 1
+    assert len(PERMISSION_TABLE) == 512
+    assert PERMISSION_TABLE[0o754] == "rwxr-xr--"
+    assert all(stat.filemode(stat.S_IFREG | mode)[1:] == PERMISSION_TABLE[mode] for mode in range(512))
+    assert ls_instance.get_mode_info(stat.S_IFDIR | 0o700, "name")[0] == "drwx------"
+    assert first == second == time.strftime("%b %e %R", time.gmtime(9999961))
+    assert len(ls_instance.time_strings) == 2
+    assert old == time.strftime("%b %e  %Y", time.gmtime(0))
+
+
+def test_ls_recursive_and_tree(tmp_path) -> None:
+    """ Walk a directory with ls -R and tree (depth limits and exclude patterns included) """
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "deep.txt").write_text("")
+    (tmp_path / "a" / "skip.pyc").write_text("")
+    (tmp_path / "z.txt").write_text("")
+    TTYI = _initialise_class([])
+    memory_sink = MemorySink(0)
+    TTYI.set_output_sink(memory_sink)
+    tree_status = TTYI.bind_tree(["--exclude", "*.pyc", str(tmp_path)])
+    tree_output = memory_sink.getvalue()
+    memory_sink.clear()
+    TTYI.bind_tree(["-L", "1", str(tmp_path)])
+    shallow_output = memory_sink.getvalue()
+    memory_sink.clear()
+    ls_status = TTYI.bind_ls(["-R", "-1", "--max-depth", "2", str(tmp_path)])
+    ls_output = memory_sink.getvalue()
+    invalid_status = TTYI.bind_tree([str(tmp_path / "z.txt")])
+    memory_sink.clear()
+    unknown_statuses = [
+        TTYI.bind_tree([option, str(tmp_path)])
+        for option in ("-t", "-1", "-R")
+    ]
+    TTYI.flush_output()
+    unknown_output = memory_sink.getvalue()
+    status = _de_initialise_class(TTYI)
+    assert tree_output == (
+        f"{tmp_path}\n"
+        "├── a\n"
+        "│   └── b\n"
+        "│       └── deep.txt\n"
+        "└── z.txt\n"
+        "\n"
+        "2 directories, 2 files\n"
+    )
+    assert shallow_output == f"{tmp_path}\n├── a\n└── z.txt\n\n1 directory, 1 file\n"
+    assert ls_output == (
+        f"{tmp_path}:\na\nz.txt\n"
+        f"\n{tmp_path / 'a'}:\nb\nskip.pyc\n"
+    )
+    assert tree_status == TTYI.success
+    assert ls_status == TTYI.success
+    assert invalid_status == TTYI.error
+    assert unknown_statuses == [TTYI.error] * 3
+    assert unknown_output == "Unknown option: -t\nUnknown option: -1\nUnknown option: -R\n"
+    assert status == TTYI.success
+
+
+def test_ls_sort_and_head(tmp_path) -> None:
+    """ Sort by time and size, reverse the order, filter the names and only keep the first entries """
+    for index, name in enumerate(("c.log", "a.log", "d.txt", "b.log")):
+        path = tmp_path / name
+        path.write_text("x" * (10 - index))
+        os.utime(str(path), (1000000 + index * 100, 1000000 + index * 100))
+    TTYI = _initialise_class([])
+    memory_sink = MemorySink(0)
+    TTYI.set_output_sink(memory_sink)
+    results = []
+    for args in (["-t"], ["-t", "-r"], ["-S", "--head", "2"], ["-r", "--head", "2"], ["--glob", "*.log", "-t", "--head", "2"], ["--head", "0"]):
+        memory_sink.clear()
+        TTYI.bind_ls(["-1"] + args + [str(tmp_path)])
+        results.append(memory_sink.getvalue().split())
+    memory_sink.clear()
+    table_status = TTYI.bind_ls(["-S", "-r", "--head", "1", str(tmp_path)])
+    table = memory_sink.getvalue()
+    memory_sink.clear()
+    failed_status = TTYI.ls.list_files(
+        [str(tmp_path / name) for name in ("missing_1", "missing_2", "b.log")],
+        TTYI.ls.parse_options(["-t", "--head", "1"])[0]
+    )
+    failed_errors = memory_sink.get_errors()
+    failed_table = memory_sink.getvalue()
+    status = _de_initialise_class(TTYI)
+    assert failed_status == TTYI.error
+    assert failed_errors.count("No such file or directory") == 1
+    assert "b.log" not in failed_table
+    assert results[0] == ["b.log", "d.txt", "a.log", "c.log"]
+    assert results[1] == ["c.log", "a.log", "d.txt", "b.log"]
+    assert results[2] == ["c.log", "a.log"]
+    assert results[3] == ["d.txt", "c.log"]
+    assert results[4] == ["b.log", "a.log"]
+    assert results[5] == []
+    assert "b.log" in table and "c.log" not in table
+    assert table_status == TTYI.success
+    assert status == TTYI.success
+
+
+def test_ls_directory_fd(tmp_path) -> None:
+    """ List directories from several threads without touching the working directory (with and without descriptors) """
+    import threading
+    directories = []
+    for index in range(4):
+        directory = tmp_path / f"dir_{index}"
+        (directory / "sub").mkdir(parents=True)
+        (directory / f"file_{index}").write_text("")
+        directories.append(directory)
+    _create_listing_directory(tmp_path / "dir_0")
+    outputs = {}
+
+    def _list(directory) -> None:
+        sink = MemorySink(0)
+        HLLs(SUCCESS, ERROR, sink).ls(f"{directory}/sub/..")
+        outputs[directory.name] = sink.getvalue()
+    working_directory = os.getcwd()
+    with unittest.mock.patch("os.chdir", side_effect=AssertionError("chdir")):
+        threads = [threading.Thread(target=_list, args=(directory,)) for directory in directories]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    fallback_sink = MemorySink(0)
+    fallback = HLLs(SUCCESS, ERROR, fallback_sink)
+    fallback.use_directory_fd = False
+    fallback.ls(f"{directories[0]}/sub/..")
+    assert os.getcwd() == working_directory
+    for index, directory in enumerate(directories):
+        assert f"file_{index}" in outputs[directory.name]
+        assert "sub" in outputs[directory.name]
+    assert fallback_sink.getvalue() == outputs["dir_0"]
+    if system() != "Windows":
+        assert f"c_link -> {directories[0] / 'missing'}" in outputs["dir_0"]
+
+
+def test_ls_listing_cache(tmp_path) -> None:
+    """ List an unchanged directory from the cache, detect the changes and evict the listings that do not fit """
+    _create_listing_directory(tmp_path)
+    past = time.time() - 100
+    os.utime(str(tmp_path), (past, past))
+    sink = MemorySink(0)
+    ls_instance = HLLs(SUCCESS, ERROR, sink, listing_cache_size=1024 * 1024)
+    ls_instance.ls(str(tmp_path))
+    first_listing = sink.getvalue()
+    sink.clear()
+    with unittest.mock.patch("os.scandir", side_effect=os.scandir) as scandir_mock, unittest.mock.patch("os.stat", side_effect=os.stat) as stat_mock:
+        ls_instance.ls(str(tmp_path))
+        cached_scandir_calls = scandir_mock.call_count
+        cached_stat_calls = stat_mock.call_count
+        cached_listing = sink.getvalue()
+        ls_instance.ls(str(tmp_path), ls_instance.parse_options(["--no-cache"])[0])
+        uncached_scandir_calls = scandir_mock.call_count
+    (tmp_path / "new_file").write_text("")
+    sink.clear()
+    ls_instance.ls(str(tmp_path))
+    updated_listing = sink.getvalue()
+    os.utime(str(tmp_path), (past, past))
+    directory_stat = os.stat(str(tmp_path))
+    entries = ls_instance.get_cached_level(str(tmp_path), ls_instance.parse_options([])[0])
+    small_cache = ListingCache(600)
+    stored = small_cache.put("a", directory_stat, entries[:1])
+    small_cache.put("b", directory_stat, entries[:1])
+    too_big = small_cache.put("c", directory_stat, entries * 10)
+    recent = small_cache.put("d", os.stat(str(tmp_path / "new_file")), entries[:1])
+    ls_instance.listing_cache.clear()
+    stat_entry = ls_instance.stat_entry
+
+    def _failing_stat(entry):
+        if entry.name == "b_file.txt":
+            return FileNotFoundError(2, "No such file or directory")
+        return stat_entry(entry)
+
+    failures = []
+    with unittest.mock.patch.object(ls_instance, "stat_entry", side_effect=_failing_stat):
+        for args in ([], ["--no-cache"]):
+            sink.clear()
+            failed_status = ls_instance.ls(str(tmp_path), ls_instance.parse_options(args)[0])
+            failures.append((failed_status, sink.get_errors()))
+    assert failures[0] == failures[1] == (ERROR, "b_file.txt: No such file or directory\n")
+    assert len(ls_instance.listing_cache) == 0
+    assert cached_listing == first_listing
+    assert ls_instance.listing_cache.hits == 1
+    assert cached_scandir_calls == 0
+    # ---- One stat for the directory (plus the check of the target of the symbolic link) ----
+    assert cached_stat_calls == (1 if system() == "Windows" else 2)
+    assert uncached_scandir_calls == 1
+    assert "new_file" in updated_listing
+    assert stored is True and too_big is False and recent is False
+    assert list(small_cache.listings) == ["b"]
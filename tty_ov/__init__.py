@@ -5,6 +5,10 @@ from .tty_ov import TTY
 from .tty_ov import HLLs
 from .tty_ov import ColouriseOutput as CO
 from .tty_ov import AskQuestion as AQ
+from .command_registry import CommandRegistry
+from .execution import ExecutionResult
+from .history import CommandHistory
+from .output import OutputSink, TerminalSink, MemorySink, FileSink, NullSink
 
 
 class ColouriseOutput(CO):
@@ -1,4 +1,5 @@
 from .tty_ov import TTY, ColouriseOutput, AskQuestion
+from .history import get_default_history_path
 
 if __name__ == "__main__":
     ERR = 84
@@ -29,7 +30,8 @@ if __name__ == "__main__":
         COLOUR_LIB,
         ASK_QUESTION,
         CONSTANTS,
-        COLOURISE_OUTPUT
+        COLOURISE_OUTPUT,
+        history_file=get_default_history_path()
     )
     TTYI.load_basics()
     TTYI.mainloop("Test session")
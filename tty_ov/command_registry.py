@@ -0,0 +1,304 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: command_registry.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 10:12:04 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of storing the commands that the shell can run (and their aliases).
+# // AR
+# +==== END tty_ov =================+
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+class CommandRegistry:
+    """
+    The class in charge of storing the commands available in the shell.
+    Every command is stored once (under it's canonical name) and every name that can be typed (canonical or alias) points to it, so a lookup is a single dictionary access.
+    """
+
+    def __init__(self, description_token: str = "desc", default_description: str = "No description provided\n") -> None:
+        # ---- The key used for the descriptions in the legacy option dictionaries ----
+        self.description_token = description_token
+        self.default_description = default_description
+        # ---- canonical name -> command entry ----
+        self.commands: Dict[str, Dict[str, Any]] = {}
+        # ---- any typed name (canonical or alias) -> canonical name ----
+        self.names_index: Dict[str, str] = {}
+        # ---- plugin name -> canonical names it registered ----
+        self.plugins: Dict[str, List[str]] = {}
+        # ---- functions called with (added, removed) names on every change (i.e. the completion index) ----
+        self.listeners: List[Callable[[List[str], List[str]], None]] = []
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names_index
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.commands))
+
+    def resolve(self, name: str) -> Optional[str]:
+        """ Return the canonical name of a command (or None if it is not known) """
+        return self.names_index.get(name)
+
+    def get_entry(self, name: str) -> Optional[Dict[str, Any]]:
+        """ Return the entry of a command based on any of it's names """
+        canonical = self.names_index.get(name)
+        if canonical is None:
+            return None
+        return self.commands[canonical]
+
+    def get_function(self, name: str) -> Optional[Callable]:
+        """ Return the function bound to a command name (or None if it is not known) """
+        canonical = self.names_index.get(name)
+        if canonical is None:
+            return None
+        return self.commands[canonical]["function"]
+
+    def get_description(self, name: str) -> str:
+        """ Return the description of a command """
+        entry = self.get_entry(name)
+        if entry is None:
+            return ""
+        return entry[self.description_token]
+
+    def get_aliases(self, name: str) -> List[str]:
+        """ Return the aliases of a command """
+        entry = self.get_entry(name)
+        if entry is None:
+            return []
+        return list(entry["aliases"])
+
+    def add_listener(self, listener: Callable[[List[str], List[str]], None]) -> None:
+        """ Register a function that will be called with the (added, removed) names every time the registry changes """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[List[str], List[str]], None]) -> None:
+        """ Stop notifying a function about the changes of the registry """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, added: List[str], removed: List[str]) -> None:
+        """ Inform the listeners that names were added to or removed from the registry """
+        for listener in self.listeners:
+            listener(added, removed)
+
+    def names(self) -> List[str]:
+        """ Return every name that can be typed to call a command """
+        return list(self.names_index)
+
+    def get_conflicts(self, names: List[str], plugin: Optional[str] = None) -> List[str]:
+        """
+        Return the names that would be removed if the given names were added (the aliases of a replaced command are dropped with it).
+        The commands that belong to 'plugin' are not reported since a plugin can replace it's own commands.
+        """
+        conflicts = {}
+        for name in names:
+            canonical = self.names_index.get(name)
+            if canonical is None:
+                continue
+            if plugin is not None and self.commands[canonical]["plugin"] == plugin:
+                continue
+            conflicts[name] = None
+            if canonical == name:
+                for alias in self.commands[canonical]["aliases"]:
+                    conflicts[alias] = None
+        return list(conflicts)
+
+    def add_command(self, name: str, function: Callable, description: Optional[str] = None, aliases: Optional[List[str]] = None, plugin: Optional[str] = None) -> List[str]:
+        """ Add (or replace) a command and it's aliases, the names that were displaced are returned """
+        displaced = self.remove_command(name)
+        if description is None:
+            description = self.default_description
+        self.commands[name] = {
+            "name": name,
+            "function": function,
+            self.description_token: description,
+            "aliases": [],
+            "plugin": plugin
+        }
+        self.names_index[name] = name
+        self.notify([name], [])
+        if aliases is not None:
+            for alias in aliases:
+                displaced.extend(self.remove_command(alias))
+                self.add_alias(alias, name)
+        return displaced
+
+    def add_alias(self, alias: str, name: str, replace: bool = False) -> bool:
+        """
+        Make an alias point to an existing command.
+        An alias that is already the name of a command is refused unless replace is True (the command and all of it's aliases would be removed).
+        """
+        canonical = self.names_index.get(name)
+        if canonical is None or alias == canonical:
+            return False
+        if alias in self.commands:
+            if replace is False:
+                return False
+            self.remove_command(alias)
+        elif alias in self.names_index:
+            self.remove_command(alias)
+        self.commands[canonical]["aliases"].append(alias)
+        self.names_index[alias] = canonical
+        self.notify([alias], [])
+        return True
+
+    def get_option_name(self, option: Dict[str, Any]) -> Optional[str]:
+        """ Return the name of a command written in the legacy format: {"name": function, "desc": "description"} """
+        for key in option:
+            if key != self.description_token:
+                return key
+        return None
+
+    def get_names(self, functions: Union[List[Dict[str, Any]], Dict[str, Callable]]) -> List[str]:
+        """ Return the names of the commands contained in a batch (see add_many) """
+        if isinstance(functions, dict):
+            return [
+                name for name, function in functions.items()
+                if name != self.description_token and callable(function)
+            ]
+        names = []
+        for function in functions:
+            if function is None or isinstance(function, dict) is False:
+                continue
+            name = self.get_option_name(function)
+            if name is not None:
+                names.append(name)
+        return names
+
+    def is_taken(self, name: str, plugin: Optional[str] = None) -> bool:
+        """ Return True if the name is used by a command that does not belong to 'plugin' """
+        entry = self.get_entry(name)
+        if entry is None:
+            return False
+        return plugin is None or entry["plugin"] != plugin
+
+    def add_from_dict(self, option: Dict[str, Any], plugin: Optional[str] = None, replace: bool = True) -> Optional[str]:
+        """ Add a command written in the legacy format: {"name": function, "desc": "description"} """
+        name = self.get_option_name(option)
+        if name is None:
+            return None
+        if replace is False and self.is_taken(name, plugin):
+            return None
+        self.add_command(
+            name,
+            option[name],
+            option.get(self.description_token),
+            plugin=plugin
+        )
+        return name
+
+    def add_many(self, functions: Union[List[Dict[str, Any]], Dict[str, Callable]], plugin: Optional[str] = None, replace: bool = True) -> List[str]:
+        """
+        Add a batch of commands in a single pass.
+        The batch is either a list of legacy option dictionaries or a namespace in the form {"name": function}.
+        If replace is False, the names that are already used by another command are skipped.
+        The names that were added are returned.
+        """
+        added = []
+        if isinstance(functions, dict):
+            for name, function in functions.items():
+                if name == self.description_token or not callable(function):
+                    continue
+                if replace is False and self.is_taken(name, plugin):
+                    continue
+                self.add_command(name, function, plugin=plugin)
+                added.append(name)
+            return added
+        for function in functions:
+            if function is None or isinstance(function, dict) is False:
+                continue
+            name = self.add_from_dict(function, plugin, replace)
+            if name is not None:
+                added.append(name)
+        return added
+
+    def remove_many(self, names: List[str]) -> List[str]:
+        """ Remove a batch of commands, the names that were removed are returned """
+        removed = []
+        for name in names:
+            removed.extend(self.remove_command(name))
+        return removed
+
+    def register_plugin(self, plugin: str, functions: Union[List[Dict[str, Any]], Dict[str, Callable]], replace: bool = True) -> List[str]:
+        """
+        Register all the commands of a plugin.
+        If a plugin with the same name is already loaded, it is unloaded first so that it can be hot-swapped.
+        If replace is False, the names that are already used by another command are skipped.
+        """
+        if plugin in self.plugins:
+            self.unregister_plugin(plugin)
+        added = self.add_many(functions, plugin, replace)
+        self.plugins[plugin] = added
+        return added
+
+    def unregister_plugin(self, plugin: str) -> List[str]:
+        """ Remove all the commands that a plugin registered, the names that were removed are returned """
+        names = self.plugins.pop(plugin, [])
+        removed = []
+        for name in names:
+            entry = self.commands.get(name)
+            if entry is None or entry["plugin"] != plugin:
+                continue
+            removed.extend(self.remove_command(name))
+        return removed
+
+    def remove_command(self, name: str) -> List[str]:
+        """
+        Remove a command.
+        If the name is an alias, only the alias is removed, otherwise, the command and all of it's aliases are removed.
+        The names that were removed are returned.
+        """
+        canonical = self.names_index.get(name)
+        if canonical is None:
+            return []
+        if canonical != name:
+            del self.names_index[name]
+            self.commands[canonical]["aliases"].remove(name)
+            self.notify([], [name])
+            return [name]
+        entry = self.commands.pop(canonical)
+        removed = [canonical]
+        del self.names_index[canonical]
+        for alias in entry["aliases"]:
+            del self.names_index[alias]
+            removed.append(alias)
+        self.notify([], removed)
+        return removed
+
+    def clear(self) -> None:
+        """ Remove all the commands """
+        removed = list(self.names_index)
+        self.commands.clear()
+        self.names_index.clear()
+        self.plugins.clear()
+        if len(removed) > 0:
+            self.notify([], removed)
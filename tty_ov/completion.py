@@ -0,0 +1,289 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: completion.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 10:41:27 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of the auto-completion of the commands typed in the prompt.
+# // AR
+# +==== END tty_ov =================+
+"""
+import os
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from prompt_toolkit.completion import Completer, Completion
+from prompt_toolkit.document import Document
+from .command_registry import CommandRegistry
+
+
+class TrieNode:
+    """ A node of the command trie """
+    __slots__ = ("children", "is_word", "sorted_keys")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "TrieNode"] = {}
+        self.is_word = False
+        self.sorted_keys: Optional[List[str]] = None
+
+
+class CommandTrie:
+    """ A prefix tree containing the names of the commands, used to find the completions of a prefix without scanning every command """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self.root = TrieNode()
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find_node(word)
+        return node is not None and node.is_word
+
+    def _find_node(self, prefix: str) -> Optional[TrieNode]:
+        """ Return the node reached by following the prefix (or None if no word starts with it) """
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, word: str) -> None:
+        """ Add a word to the trie """
+        node = self.root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = TrieNode()
+                node.children[char] = child
+                node.sorted_keys = None
+            node = child
+        if node.is_word is False:
+            node.is_word = True
+            self.size += 1
+
+    def remove(self, word: str) -> bool:
+        """ Remove a word from the trie, the branches that became empty are pruned """
+        path = []
+        node = self.root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                return False
+            path.append((node, char))
+            node = child
+        if node.is_word is False:
+            return False
+        node.is_word = False
+        self.size -= 1
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.is_word or len(child.children) > 0:
+                break
+            del parent.children[char]
+            parent.sorted_keys = None
+        return True
+
+    def clear(self) -> None:
+        """ Remove every word from the trie """
+        self.root = TrieNode()
+        self.size = 0
+
+    def starts_with(self, prefix: str, limit: int = 0) -> List[str]:
+        """ Return the words starting with the prefix in alphabetical order (at most 'limit' words if limit is above 0) """
+        node = self._find_node(prefix)
+        if node is None:
+            return []
+        results = []
+        stack = [(node, prefix)]
+        while len(stack) > 0:
+            node, word = stack.pop()
+            if node.is_word:
+                results.append(word)
+                if 0 < limit <= len(results):
+                    break
+            if node.sorted_keys is None:
+                node.sorted_keys = sorted(node.children)
+            for char in reversed(node.sorted_keys):
+                stack.append((node.children[char], word + char))
+        return results
+
+
+class DirectoryListingCache:
+    """
+    A small LRU cache of directory listings, keyed by the path of the directory and validated against it's modification time.
+    As long as a directory does not change, completing inside of it only costs a stat call instead of a full listing.
+    """
+
+    def __init__(self, max_directories: int = 32) -> None:
+        self.max_directories = max_directories
+        # ---- path -> (mtime_ns, sorted names, is_directory flags) ----
+        self.listings: "OrderedDict[str, Tuple[int, List[str], List[bool]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def clear(self) -> None:
+        """ Forget all the cached listings """
+        self.listings.clear()
+
+    def scan_directory(self, path: str) -> Tuple[List[str], List[bool]]:
+        """ List a directory, the type of the entries is taken from the directory entries (no extra stat calls) """
+        content = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_directory = entry.is_dir()
+                except OSError:
+                    is_directory = False
+                content.append((entry.name, is_directory))
+        content.sort()
+        names = [i[0] for i in content]
+        is_directory_flags = [i[1] for i in content]
+        return (names, is_directory_flags)
+
+    def get_listing(self, path: str) -> Tuple[List[str], List[bool]]:
+        """ Return the (sorted names, is_directory flags) of a directory, only listing it again if it was modified """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self.listings.pop(path, None)
+            return ([], [])
+        cached = self.listings.get(path)
+        if cached is not None and cached[0] == mtime:
+            self.listings.move_to_end(path)
+            return (cached[1], cached[2])
+        try:
+            names, is_directory_flags = self.scan_directory(path)
+        except OSError:
+            return ([], [])
+        self.listings[path] = (mtime, names, is_directory_flags)
+        self.listings.move_to_end(path)
+        while len(self.listings) > self.max_directories:
+            self.listings.popitem(last=False)
+        return (names, is_directory_flags)
+
+
+class PathCompleter:
+    """ The class in charge of completing the file system paths passed as arguments to commands """
+
+    def __init__(self, listing_cache: Optional[DirectoryListingCache] = None, max_completions: int = 200) -> None:
+        if listing_cache is None:
+            listing_cache = DirectoryListingCache()
+        self.listing_cache = listing_cache
+        self.max_completions = max_completions
+
+    def complete_path(self, word: str) -> List[Tuple[str, bool]]:
+        """ Return the (name, is_directory) of the entries of the directory in 'word' that start with the last part of 'word' """
+        directory, prefix = os.path.split(word)
+        if directory == "":
+            directory = "."
+        path = os.path.abspath(os.path.expanduser(directory))
+        names, is_directory_flags = self.listing_cache.get_listing(path)
+        results = []
+        index = bisect_left(names, prefix)
+        length = len(names)
+        while index < length and len(results) < self.max_completions:
+            name = names[index]
+            if not name.startswith(prefix):
+                break
+            if prefix != "" or name[0] != ".":
+                results.append((name, is_directory_flags[index]))
+            index += 1
+        return results
+
+    def get_completions(self, word: str):
+        """ Yield the completions for the path that is being typed """
+        for name, is_directory in self.complete_path(word):
+            display = name
+            if is_directory:
+                display += "/"
+            yield Completion(
+                display,
+                start_position=-len(os.path.basename(word)),
+                display=display
+            )
+
+
+class CommandCompleter(Completer):
+    """ The prompt_toolkit completer in charge of suggesting the commands that are present in the registry """
+
+    def __init__(self, registry: CommandRegistry, command_seperator_token: str = "@#", max_completions: int = 200) -> None:
+        self.registry = registry
+        self.command_seperator_token = command_seperator_token
+        self.max_completions = max_completions
+        self.trie = CommandTrie(registry.names())
+        # ---- The commands whose arguments are file system paths ----
+        self.path_commands = {"cd", "ls", "tree", "rm", "rmdir", "touch", "mkdir"}
+        self.path_completer = PathCompleter(max_completions=max_completions)
+        registry.add_listener(self.update)
+
+    def update(self, added: List[str], removed: List[str]) -> None:
+        """ Keep the trie in sync with the registry (called by the registry on every change) """
+        for name in removed:
+            self.trie.remove(name)
+        for name in added:
+            self.trie.insert(name)
+
+    def rebuild(self) -> None:
+        """ Rebuild the trie from the content of the registry """
+        self.trie = CommandTrie(self.registry.names())
+
+    def complete_command(self, prefix: str) -> List[str]:
+        """ Return the command names that start with the prefix """
+        return self.trie.starts_with(prefix, self.max_completions)
+
+    def get_current_command(self, text: str) -> str:
+        """ Return the text of the command that is being typed (the part after the last command seperator) """
+        token = f" {self.command_seperator_token} "
+        index = text.rfind(token)
+        if index != -1:
+            text = text[index + len(token):]
+        elif text.startswith(f"{self.command_seperator_token} "):
+            text = text[len(self.command_seperator_token) + 1:]
+        return text.lstrip()
+
+    def get_completions(self, document: Document, complete_event):
+        """ Yield the completions for the text before the cursor """
+        text = self.get_current_command(document.text_before_cursor)
+        if " " in text:
+            command = text.split(" ", 1)[0].lower()
+            if self.registry.resolve(command) in self.path_commands:
+                yield from self.path_completer.get_completions(
+                    text.rsplit(" ", 1)[-1]
+                )
+            return
+        for name in self.complete_command(text.lower()):
+            yield Completion(
+                name,
+                start_position=-len(text),
+                display_meta=self.registry.get_description(name).strip()
+            )
@@ -0,0 +1,53 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: execution.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 12:31:52 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file containing the result returned when a command is run without a terminal.
+# // AR
+# +==== END tty_ov =================+
+"""
+
+
+class ExecutionResult:
+    """ The result of a line that was run through TTY.execute """
+    __slots__ = ("line", "status", "stdout", "stderr", "duration")
+
+    def __init__(self, line: str, status: int, stdout: str = "", stderr: str = "", duration: float = 0.0) -> None:
+        # ---- The line that was run ----
+        self.line = line
+        # ---- The status code of the last command of the line ----
+        self.status = status
+        # ---- The text that the commands displayed (without colours) ----
+        self.stdout = stdout
+        self.stderr = stderr
+        # ---- The time it took to run the line (in seconds) ----
+        self.duration = duration
+
+    def __repr__(self) -> str:
+        return f"ExecutionResult(line={self.line!r}, status={self.status!r}, duration={self.duration:.6f})"
@@ -0,0 +1,430 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: history.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 14:05:12 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of remembering the commands that were typed.
+# // AR
+# +==== END tty_ov =================+
+"""
+import os
+import mmap
+import atexit
+import asyncio
+import threading
+from typing import AsyncGenerator, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from prompt_toolkit.history import History
+
+
+def get_default_history_path() -> str:
+    """ Return the path of the file in which the history is saved by default """
+    if "XDG_DATA_HOME" in os.environ:
+        base = os.environ["XDG_DATA_HOME"]
+    elif "LOCALAPPDATA" in os.environ:
+        base = os.environ["LOCALAPPDATA"]
+    else:
+        base = os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "tty_ov", "history")
+
+
+def escape_line(line: str) -> str:
+    """ Escape the backslashes and the line breaks so that a command always uses a single line of the history file """
+    return line.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def unescape_line(line: str) -> str:
+    """ Revert escape_line """
+    if "\\" not in line:
+        return line
+    result = []
+    index = 0
+    length = len(line)
+    while index < length:
+        char = line[index]
+        if char == "\\" and index + 1 < length:
+            index += 1
+            char = {"n": "\n", "r": "\r"}.get(line[index], line[index])
+        result.append(char)
+        index += 1
+    return "".join(result)
+
+
+class HistoryFile:
+    """
+    The append-only file in which the history is saved.
+    The lines are queued and written in batches by a background thread (and synced to the disk every fsync_interval seconds), so typing a command never waits for the disk.
+    Only the end of the file is read when the history is loaded, so the startup time does not depend on the size of the file.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, fsync_interval: float = 10.0, encoding: str = "utf-8") -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.encoding = encoding
+        self.pending: List[str] = []
+        self.lock = threading.Lock()
+        self.wake_up = threading.Event()
+        self.stopping = False
+        self.thread: Optional[threading.Thread] = None
+        # ---- The number of lines written since the last fsync ----
+        self.unsynced = 0
+
+    def load_tail(self, count: int) -> List[str]:
+        """ Return the last 'count' lines of the file (oldest first), only the end of the file is read """
+        if count <= 0:
+            return []
+        try:
+            with open(self.path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    end = len(content)
+                    if content[end - 1:end] == b"\n":
+                        end -= 1
+                    start = end
+                    lines = []
+                    while len(lines) < count and start > 0:
+                        index = content.rfind(b"\n", 0, end)
+                        start = index + 1
+                        lines.append(content[start:end])
+                        end = index
+                        if index == -1:
+                            break
+        except OSError:
+            return []
+        lines.reverse()
+        return [
+            unescape_line(line.decode(self.encoding, errors="replace"))
+            for line in lines
+        ]
+
+    def append(self, line: str) -> None:
+        """ Queue a line, it is written by the background thread """
+        with self.lock:
+            self.pending.append(escape_line(line) + "\n")
+        if self.thread is None:
+            self.start()
+
+    def start(self) -> None:
+        """ Start the thread in charge of writing the queued lines """
+        self.stopping = False
+        self.thread = threading.Thread(
+            target=self.writer_loop,
+            name="tty_ov-history",
+            daemon=True
+        )
+        self.thread.start()
+        atexit.register(self.close)
+
+    def writer_loop(self) -> None:
+        """ Write the queued lines every flush_interval seconds and sync the file every fsync_interval seconds """
+        seconds_since_sync = 0.0
+        while self.stopping is False:
+            self.wake_up.wait(self.flush_interval)
+            self.wake_up.clear()
+            seconds_since_sync += self.flush_interval
+            sync = seconds_since_sync >= self.fsync_interval
+            if sync:
+                seconds_since_sync = 0.0
+            self.write_pending(sync)
+
+    def write_pending(self, sync: bool = False) -> None:
+        """ Write the queued lines in a single call """
+        with self.lock:
+            lines = self.pending
+            self.pending = []
+        if len(lines) == 0 and (sync is False or self.unsynced == 0):
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding=self.encoding, errors="replace") as file:
+                file.write("".join(lines))
+                file.flush()
+                self.unsynced += len(lines)
+                if sync:
+                    os.fsync(file.fileno())
+                    self.unsynced = 0
+        except OSError:
+            return
+
+    def flush(self) -> None:
+        """ Write and sync the queued lines now """
+        self.write_pending(True)
+
+    def close(self) -> None:
+        """ Stop the background thread, the queued lines are written before returning """
+        thread = self.thread
+        if thread is not None:
+            self.stopping = True
+            self.wake_up.set()
+            thread.join()
+            self.thread = None
+            atexit.unregister(self.close)
+        self.flush()
+
+
+class TrigramIndex:
+    """
+    An inverted index mapping every 3 characters sequence to the numbers of the lines containing it.
+    A substring search only checks the lines containing all the trigrams of the searched text instead of every line of the history.
+    """
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def get_trigrams(self, text: str) -> Set[str]:
+        """ Return the distinct trigrams of a text """
+        return {text[index:index + 3] for index in range(len(text) - 2)}
+
+    def add(self, number: int, line: str) -> None:
+        """ Index a line """
+        for trigram in self.get_trigrams(line):
+            posting = self.postings.get(trigram)
+            if posting is None:
+                self.postings[trigram] = {number}
+            else:
+                posting.add(number)
+
+    def remove(self, number: int, line: str) -> None:
+        """ Remove a line from the index (i.e. when it was dropped from the history) """
+        for trigram in self.get_trigrams(line):
+            posting = self.postings.get(trigram)
+            if posting is None:
+                continue
+            posting.discard(number)
+            if len(posting) == 0:
+                del self.postings[trigram]
+
+    def candidates(self, text: str) -> Optional[Set[int]]:
+        """ Return the numbers of the lines that can contain the text (None if the text is too short to use the index) """
+        trigrams = self.get_trigrams(text)
+        if len(trigrams) == 0:
+            return None
+        postings = []
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if len(result) == 0:
+                break
+        return result
+
+    def clear(self) -> None:
+        """ Empty the index """
+        self.postings.clear()
+
+
+class CommandHistory:
+    """
+    A fixed capacity ring buffer containing the commands that were typed.
+    The lines are stored encoded (bytes are more compact than str) and, once the buffer is full, every new line replaces the oldest one, so the memory used stays flat however long the session runs.
+    Every line keeps the number it got when it was added (like bash), so the numbers displayed do not change when old lines are dropped.
+    """
+
+    def __init__(self, capacity: int = 10000, encoding: str = "utf-8", history_file: Optional[HistoryFile] = None) -> None:
+        if capacity < 1:
+            raise ValueError("The capacity of the history must be at least 1")
+        self.capacity = capacity
+        self.encoding = encoding
+        # ---- The file in which the lines are saved (None to keep the history in memory only) ----
+        self.history_file = history_file
+        self.entries: List[bytes] = []
+        # ---- The slot that will receive the next line once the buffer is full ----
+        self.head = 0
+        # ---- The number of lines that were ever added ----
+        self.total = 0
+        # ---- The index used by the reverse search ----
+        self.search_index = TrigramIndex()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self.entries)):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> str:
+        """ Return a line based on it's position in the buffer (0 is the oldest line, -1 the newest) """
+        length = len(self.entries)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("history index out of range")
+        return self.entries[(self.head + index) % length].decode(self.encoding)
+
+    @property
+    def first_number(self) -> int:
+        """ The number of the oldest line that is still in the buffer """
+        return self.total - len(self.entries)
+
+    def append(self, line: str, save: bool = True) -> Optional[int]:
+        """ Add a line to the history, the number of the line that was dropped to make room for it is returned (None if nothing was dropped) """
+        if save is True and self.history_file is not None:
+            self.history_file.append(line)
+        data = line.encode(self.encoding, errors="replace")
+        self.search_index.add(self.total, line)
+        self.total += 1
+        if len(self.entries) < self.capacity:
+            self.entries.append(data)
+            return None
+        dropped = self.total - self.capacity - 1
+        self.search_index.remove(
+            dropped,
+            self.entries[self.head].decode(self.encoding)
+        )
+        self.entries[self.head] = data
+        self.head = (self.head + 1) % self.capacity
+        return dropped
+
+    def get(self, number: int) -> Optional[str]:
+        """ Return the line that got the given number (None if it is not in the buffer anymore) """
+        index = number - self.first_number
+        if index < 0 or index >= len(self.entries):
+            return None
+        return self[index]
+
+    def get_range(self, start: int, stop: int) -> List[Tuple[int, str]]:
+        """ Return the (number, line) of the lines numbered from start to stop (both included) """
+        start = max(start, self.first_number)
+        stop = min(stop, self.total - 1)
+        return [(number, self.get(number)) for number in range(start, stop + 1)]
+
+    def tail(self, count: int) -> List[Tuple[int, str]]:
+        """ Return the (number, line) of the last 'count' lines """
+        if count <= 0:
+            return []
+        return self.get_range(self.total - count, self.total - 1)
+
+    def search(self, text: str, before: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """ Return the (number, line) of the newest line containing 'text' whose number is below 'before' (None if no line matches) """
+        if before is None or before > self.total:
+            before = self.total
+        candidates = self.search_index.candidates(text)
+        if candidates is None:
+            numbers = range(before - 1, self.first_number - 1, -1)
+        else:
+            numbers = sorted(
+                (number for number in candidates if number < before),
+                reverse=True
+            )
+        for number in numbers:
+            line = self.get(number)
+            if line is not None and text in line:
+                return (number, line)
+        return None
+
+    def rebuild_index(self) -> None:
+        """ Index the lines of the history from scratch """
+        self.search_index.clear()
+        first_number = self.first_number
+        for index, line in enumerate(self):
+            self.search_index.add(first_number + index, line)
+
+    def resize(self, capacity: int) -> None:
+        """ Change the capacity of the history, the oldest lines are dropped if they do not fit anymore """
+        if capacity < 1:
+            raise ValueError("The capacity of the history must be at least 1")
+        ordered = self.entries[self.head:] + self.entries[:self.head]
+        self.entries = ordered[-capacity:]
+        self.capacity = capacity
+        self.head = 0
+        self.rebuild_index()
+
+    def clear(self) -> None:
+        """ Remove every line (the numbering continues) """
+        self.entries = []
+        self.head = 0
+        self.search_index.clear()
+
+    def set_history_file(self, history_file: Optional[HistoryFile]) -> int:
+        """ Change the file in which the history is saved, the end of the file is loaded in front of the current lines and the number of loaded lines is returned """
+        if self.history_file is not None:
+            self.history_file.close()
+        self.history_file = history_file
+        if history_file is None:
+            return 0
+        current = list(self)
+        loaded = history_file.load_tail(self.capacity)
+        self.entries = []
+        self.head = 0
+        self.total = 0
+        self.search_index.clear()
+        for line in loaded:
+            self.append(line, False)
+        for line in current:
+            self.append(line)
+        return len(loaded)
+
+    def close(self) -> None:
+        """ Write the lines that are waiting to be saved """
+        if self.history_file is not None:
+            self.history_file.close()
+
+
+class PromptHistory(History):
+    """
+    The prompt_toolkit view of a CommandHistory.
+    The lines are read from the ring buffer when the prompt asks for them instead of being copied, and the shell records the lines itself once they are processed.
+    """
+
+    # ---- The number of lines loaded before giving the hand back to the prompt (the load restarts on every prompt) ----
+    LOAD_BATCH_SIZE = 1024
+
+    def __init__(self, history: CommandHistory) -> None:
+        super().__init__()
+        self.history = history
+
+    async def load(self) -> AsyncGenerator[str, None]:
+        for index, line in enumerate(self.load_history_strings(), 1):
+            yield line
+            if index % self.LOAD_BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+
+    def load_history_strings(self) -> Iterable[str]:
+        for index in range(len(self.history) - 1, -1, -1):
+            yield self.history[index]
+
+    def get_strings(self) -> Sequence[str]:
+        """ Return the history itself: prompt_toolkit only reads it's length and last line on every Enter, so nothing else is decoded """
+        return self.history
+
+    def append_string(self, string: str) -> None:
+        return
+
+    def store_string(self, string: str) -> None:
+        return
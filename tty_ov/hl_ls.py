@@ -33,12 +33,168 @@
 # +==== END tty_ov =================+
 """
 import os
-import sys
-from typing import Union
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
 import stat
 import time
 import locale
-from prettytable import PrettyTable
+import heapq
+import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import pwd
+except ImportError:
+    pwd = None
+try:
+    import grp
+except ImportError:
+    grp = None
+from .output import OutputSink, TerminalSink
+from .ls_renderer import NameRenderer, TableRenderer
+from .listing_cache import CachedEntry, ListingCache
+
+
+def _build_permission_table() -> Tuple[str, ...]:
+    """ Build the 'rwxrwxrwx' string of the 512 possible permission bits """
+    table = []
+    for mode in range(512):
+        perms = ""
+        for who in "USR", "GRP", "OTH":
+            for what in "R", "W", "X":
+                if mode & getattr(stat, "S_I" + what + who):
+                    perms = perms + what.lower()
+                else:
+                    perms = perms + "-"
+        table.append(perms)
+    return tuple(table)
+
+
+# The permission bits (mode & 0o777) -> the 'rwxrwxrwx' string
+PERMISSION_TABLE = _build_permission_table()
+
+
+def _name_key(entry: Union[os.DirEntry, "FileEntry"]) -> str:
+    """ The sort key of the entries in the name order """
+    return entry.name.lower()
+
+
+def _time_key(pair: Tuple[Union[os.DirEntry, "FileEntry"], os.stat_result]) -> float:
+    """ The sort key of the (entry, stat) pairs in the modification time order """
+    return pair[1].st_mtime
+
+
+def _size_key(pair: Tuple[Union[os.DirEntry, "FileEntry"], os.stat_result]) -> int:
+    """ The sort key of the (entry, stat) pairs in the size order """
+    return pair[1].st_size
+
+
+class LsOptions:
+    """ The options of a listing (filled from the flags passed to the ls command) """
+
+    def __init__(self) -> None:
+        # ---- -1: only display the names, one per line ----
+        self.one_per_line = False
+        # ---- -j N: the number of threads stating the entries (None to use the default of the instance) ----
+        self.stat_workers: Optional[int] = None
+        # ---- -R: list the sub directories as well ----
+        self.recursive = False
+        # ---- --max-depth N (or -L N): do not show the entries that are more than N levels below the listed path ----
+        self.max_depth: Optional[int] = None
+        # ---- --exclude PATTERN: the names matching one of these patterns are neither shown nor entered ----
+        self.exclude: List[str] = []
+        # ---- --glob PATTERN: only show the names matching one of these patterns ----
+        self.include: List[str] = []
+        # ---- -t / -S: sort by "name", "time" (newest first) or "size" (biggest first) ----
+        self.sort_by = "name"
+        # ---- -r: reverse the order ----
+        self.reverse = False
+        # ---- --head N: only show the first N entries ----
+        self.head: Optional[int] = None
+        # ---- --no-cache: read the directory even if it's listing is cached ----
+        self.use_cache = True
+
+
+class FileEntry:
+    """
+    A stand in for os.DirEntry for the paths that were passed directly to ls (and thus not produced by os.scandir).
+    The stat result is cached the same way as in os.DirEntry.
+    """
+    __slots__ = ("name", "path", "_stat")
+
+    def __init__(self, path: str) -> None:
+        self.name = path
+        self.path = path
+        self._stat = None
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        """ Return the (cached) lstat result of the path """
+        if follow_symlinks is True:
+            return os.stat(self.path)
+        if self._stat is None:
+            self._stat = os.lstat(self.path)
+        return self._stat
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        """ Check if the path is a directory """
+        try:
+            return stat.S_ISDIR(self.stat(follow_symlinks).st_mode)
+        except OSError:
+            return False
+
+    def is_symlink(self) -> bool:
+        """ Check if the path is a symbolic link """
+        try:
+            return stat.S_ISLNK(self.stat(follow_symlinks=False).st_mode)
+        except OSError:
+            return False
+
+
+# The options understood by tree (the other ls options are rejected instead of being ignored)
+TREE_OPTIONS = frozenset(("-L", "--max-depth", "--exclude"))
+
+
+# Listing through a directory descriptor keeps the working directory untouched and saves the path lookups (not available on every platform)
+SUPPORTS_DIRECTORY_FD = os.scandir in os.supports_fd and os.stat in os.supports_dir_fd and os.readlink in os.supports_dir_fd
+
+
+class ScannedDirectory:
+    """
+    A directory opened for a listing.
+    When the platform allows it, the directory is opened once and everything (scan, stat, readlink) is done relative to it's descriptor, otherwise, the path is used.
+    The descriptor must stay open while the entries are used, this is why this class is a context manager.
+    """
+
+    def __init__(self, path: str, use_fd: bool = SUPPORTS_DIRECTORY_FD) -> None:
+        self.path = path
+        self.fd: Optional[int] = None
+        if use_fd:
+            self.fd = os.open(
+                path,
+                os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)
+            )
+
+    def __enter__(self) -> "ScannedDirectory":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def scan(self) -> List[os.DirEntry]:
+        """ List the entries of the directory """
+        if self.fd is None:
+            with os.scandir(self.path) as entries:
+                return list(entries)
+        with os.scandir(self.fd) as entries:
+            return list(entries)
+
+    def get_path(self, entry: os.DirEntry) -> str:
+        """ Return the path of an entry (the path of the entries listed through a descriptor is only their name) """
+        return os.path.join(self.path, entry.name)
+
+    def close(self) -> None:
+        """ Close the descriptor of the directory """
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
 
 
 class HLLs:
@@ -52,7 +208,7 @@ class HLLs:
         - adapted the code to fit into the shell's functionalities
     """
 
-    def __init__(self, success: int = 0, error: int = 84) -> None:
+    def __init__(self, success: int = 0, error: int = 84, sink: Optional[OutputSink] = None, name_cache_ttl: Optional[float] = None, stat_workers: int = 0, listing_cache_size: int = 0) -> None:
         # ---- The colours for the TUI ----
         self.colors = {
             "default": "",
@@ -66,6 +222,27 @@ class HLLs:
         # ---- The status code ----
         self.success = success
         self.error = error
+        # ---- The destination of the listings ----
+        if sink is None:
+            sink = TerminalSink()
+        self.sink = sink
+        # ---- uid/gid -> (name, time of the lookup), the names expire after name_cache_ttl seconds (None to keep them forever) ----
+        self.name_cache_ttl = name_cache_ttl
+        self.user_names: Dict[int, Tuple[str, float]] = {}
+        self.group_names: Dict[int, Tuple[str, float]] = {}
+        # ---- The number of threads stating the entries of a listing (0 or 1 to state them one after the other) ----
+        self.stat_workers = stat_workers
+        # ---- Use directory descriptors instead of paths when possible ----
+        self.use_directory_fd = SUPPORTS_DIRECTORY_FD
+        # ---- The listings of the directories that did not change (listing_cache_size is in bytes, 0 to disable the cache) ----
+        self.listing_cache: Optional[ListingCache] = None
+        if listing_cache_size > 0:
+            self.listing_cache = ListingCache(listing_cache_size)
+        # ---- The locale is set once, on the first listing ----
+        self.locale_ready = False
+        # ---- (minute, is_old) -> formatted time, most of the entries of a directory share their modification minute ----
+        self.time_strings: Dict[Tuple[int, bool], str] = {}
+        self.max_time_strings = 4096
 
     def has_colors(self, stream) -> bool:
         """ Check if the ncurse library is present in the system for the colour management """
@@ -75,8 +252,10 @@ class HLLs:
             return False
         return False
 
-    def get_mode_info(self, mode, filename):
-        """ Get the type of document in order to apply some colour """
+    def get_mode_info(self, mode, filename, path: Optional[str] = None, dir_fd: Optional[int] = None):
+        """ Get the type of document in order to apply some colour (the link is resolved using path, relative to dir_fd if it is set, when the entry is not in the working directory) """
+        if path is None:
+            path = filename
         perms = "-"
         color = "default"
         link = ""
@@ -87,8 +266,10 @@ class HLLs:
         elif stat.S_ISLNK(mode):
             perms = "l"
             color = "purple"
-            link = os.readlink(filename)
-            if not os.path.exists(filename):
+            link = os.readlink(path, dir_fd=dir_fd)
+            try:
+                os.stat(path, dir_fd=dir_fd)
+            except OSError:
                 color = "red"
         elif stat.S_ISREG(mode):
             if mode & (stat.S_IXGRP | stat.S_IXUSR | stat.S_IXOTH):
@@ -99,39 +280,186 @@ class HLLs:
                 else:
                     color = "white"
 
-        mode = stat.S_IMODE(mode)
-
-        for who in "USR", "GRP", "OTH":
-            for what in "R", "W", "X":
-                if mode & getattr(stat, "S_I" + what + who):
-                    perms = perms + what.lower()
-                else:
-                    perms = perms + "-"
+        return (perms + PERMISSION_TABLE[mode & 0o777], color, link)
 
-        return (perms, color, link)
+    def get_cached_name(self, cache: Dict[int, Tuple[str, float]], identifier: int, lookup: Callable[[int], str]) -> str:
+        """ Return the name of an uid/gid, the system is only queried if the name is not cached (or expired) """
+        cached = cache.get(identifier)
+        if cached is not None:
+            if self.name_cache_ttl is None or time.monotonic() - cached[1] < self.name_cache_ttl:
+                return cached[0]
+        try:
+            name = lookup(identifier)
+        except KeyError:
+            name = str(identifier)
+        cache[identifier] = (name, time.monotonic())
+        return name
 
     def get_user_info(self, uid) -> str:
         """ Get the info of the user """
-        try:
-            import pwd
-            user_info = pwd.getpwuid(uid)
-            return user_info.pw_name
-        except ImportError:
+        if pwd is None:
             return str(uid)
+        return self.get_cached_name(
+            self.user_names,
+            uid,
+            lambda identifier: pwd.getpwuid(identifier).pw_name
+        )
 
     def get_group_info(self, gid) -> str:
         """ Get the pid of the active groupe """
-        try:
-            import grp
-            group_info = grp.getgrgid(gid)
-            return group_info.gr_name
-        except ImportError:
+        if grp is None:
             return str(gid)
+        return self.get_cached_name(
+            self.group_names,
+            gid,
+            lambda identifier: grp.getgrgid(identifier).gr_name
+        )
 
-    def list_files(self, files: list) -> int:
+    def preload_names(self) -> int:
+        """ Fill the user and group caches in one go (useful before listing directories owned by many users), the number of loaded names is returned """
+        now = time.monotonic()
+        loaded = 0
+        if pwd is not None:
+            for user in pwd.getpwall():
+                self.user_names[user.pw_uid] = (user.pw_name, now)
+                loaded += 1
+        if grp is not None:
+            for group in grp.getgrall():
+                self.group_names[group.gr_gid] = (group.gr_name, now)
+                loaded += 1
+        return loaded
+
+    def clear_name_cache(self) -> None:
+        """ Forget the user and group names """
+        self.user_names.clear()
+        self.group_names.clear()
+
+    def list_files(self, files: list, options: Optional[LsOptions] = None) -> int:
         """ List the files contained in the path """
+        return self.list_entries(
+            [FileEntry(filename) for filename in files],
+            options
+        )
+
+    def setup_locale(self) -> None:
+        """ Apply the locale of the user (only done once per instance as it changes the state of the whole process) """
+        if self.locale_ready is True:
+            return
+        self.locale_ready = True
+        try:
+            locale.setlocale(locale.LC_ALL, '')
+        except locale.Error:
+            return
+
+    def format_time(self, time_stamp: float, now: int, recent: int) -> str:
+        """ Format a modification time, the result is cached per minute """
+        is_old = (time_stamp < recent) or (time_stamp > now)
+        minute = int(time_stamp // 60)
+        key = (minute, is_old)
+        time_str = self.time_strings.get(key)
+        if time_str is not None:
+            return time_str
+        if is_old:
+            time_fmt = "%b %e  %Y"
+        else:
+            time_fmt = "%b %e %R"
+        time_str = time.strftime(time_fmt, time.gmtime(minute * 60))
+        if len(self.time_strings) >= self.max_time_strings:
+            self.time_strings.clear()
+        self.time_strings[key] = time_str
+        return time_str
+
+    def stat_entry(self, entry: Union[os.DirEntry, FileEntry]) -> Union[os.stat_result, OSError]:
+        """ Return the lstat result of an entry (or the error that occurred) """
+        try:
+            return entry.stat(follow_symlinks=False)
+        except OSError as err:
+            return err
+
+    def iter_stats(self, entries: List[Union[os.DirEntry, FileEntry]], workers: int) -> Iterator[Union[os.stat_result, OSError]]:
+        """
+        Yield the stat result of every entry, in the order of the entries.
+        When workers is above 1, the calls are spread over a thread pool (on network file systems, the latency of the calls dominates the listing).
+        """
+        if workers <= 1 or len(entries) <= 1:
+            for entry in entries:
+                yield self.stat_entry(entry)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tty_ov-ls") as executor:
+            yield from executor.map(self.stat_entry, entries)
+
+    def get_workers(self, options: LsOptions) -> int:
+        """ Return the number of threads used to stat the entries of a listing """
+        if options.stat_workers is None:
+            return self.stat_workers
+        return options.stat_workers
+
+    def order_entries(self, entries: List[Union[os.DirEntry, FileEntry]], options: LsOptions) -> Tuple[List[Union[os.DirEntry, FileEntry]], Optional[List[Union[os.stat_result, OSError]]]]:
+        """
+        Filter and sort the entries following the options.
+        When the order depends on the stat results, they are gathered once and returned along with the entries (None is returned otherwise).
+        When only the first --head entries are wanted, they are selected with a heap instead of sorting every entry.
+        """
+        if len(options.include) > 0:
+            entries = [
+                entry for entry in entries
+                if any(
+                    fnmatch.fnmatch(os.path.basename(entry.name), pattern)
+                    for pattern in options.include
+                )
+            ]
+        head = options.head
+        if options.sort_by == "name":
+            if head is None:
+                entries.sort(key=_name_key, reverse=options.reverse)
+            elif options.reverse:
+                entries = heapq.nlargest(head, entries, key=_name_key)
+            else:
+                entries = heapq.nsmallest(head, entries, key=_name_key)
+            return (entries, None)
+        # ---- Ties are displayed in the order of the names ----
+        entries.sort(key=_name_key)
+        failed = []
+        pairs = []
+        for entry, stat_info in zip(entries, self.iter_stats(entries, self.get_workers(options))):
+            if isinstance(stat_info, OSError):
+                failed.append((entry, stat_info))
+            else:
+                pairs.append((entry, stat_info))
+        if options.sort_by == "time":
+            key = _time_key
+        else:
+            key = _size_key
+        # ---- The newest/biggest entries come first unless -r is passed ----
+        descending = not options.reverse
+        if head is None:
+            pairs.sort(key=key, reverse=descending)
+        else:
+            # ---- The failures are displayed first, they count toward --head ----
+            failed = failed[:head]
+            head -= len(failed)
+            if descending:
+                pairs = heapq.nlargest(head, pairs, key=key)
+            else:
+                pairs = heapq.nsmallest(head, pairs, key=key)
+        pairs = failed + pairs
+        return ([pair[0] for pair in pairs], [pair[1] for pair in pairs])
+
+    def list_entries(self, entries: List[Union[os.DirEntry, FileEntry]], options: Optional[LsOptions] = None, dir_fd: Optional[int] = None) -> int:
+        """
+        List directory entries, every entry is stated at most once (os.DirEntry caches the result) and the rows are displayed as they are produced.
+        dir_fd is the descriptor of the directory the entries were listed through (if any).
+        """
+        if options is None:
+            options = LsOptions()
+        entries, stats = self.order_entries(entries, options)
+        if options.one_per_line:
+            return self.list_names(entries)
+        if stats is None:
+            stats = self.iter_stats(entries, self.get_workers(options))
         global_status = self.success
-        table = PrettyTable(
+        table = TableRenderer(
+            self.sink,
             [
                 "Permissions",
                 "# Links",
@@ -140,41 +468,39 @@ class HLLs:
                 "Size",
                 "Last Mod",
                 "Name"
-            ]
+            ],
+            ["l", "r", "l", "l", "r", "l", "l"]
         )
 
-        locale.setlocale(locale.LC_ALL, '')
-        files.sort(key=lambda x: x.lower())
+        self.setup_locale()
 
         now = int(time.time())
         recent = now - (6 * 30 * 24 * 60 * 60)
 
-        does_have_colors = self.has_colors(sys.stdout)
+        does_have_colors = self.has_colors(self.sink)
 
-        for filename in files:
-            try:
-                stat_info = os.lstat(filename)
-            except OSError:
-                sys.stderr.write(f"{filename}: No such file or directory\n")
+        for entry, stat_info in zip(entries, stats):
+            filename = entry.name
+            if isinstance(stat_info, OSError):
+                self.sink.write_error(
+                    f"{filename}: No such file or directory\n"
+                )
                 global_status = self.error
                 continue
 
             perms, color, link = self.get_mode_info(
                 stat_info.st_mode,
-                filename
+                filename,
+                entry.path,
+                dir_fd
             )
 
-            nlink = f"{stat_info.st_nlink:4d}%4d"
+            nlink = f"{stat_info.st_nlink:4d}"
             name = self.get_user_info(stat_info.st_uid)
             group = self.get_group_info(stat_info.st_gid)
             size = f"{stat_info.st_size:8d}"
 
-            time_stamp = stat_info.st_mtime
-            if (time_stamp < recent) or (time_stamp > now):
-                time_fmt = "%b %e  %Y"
-            else:
-                time_fmt = "%b %e %R"
-            time_str = time.strftime(time_fmt, time.gmtime(time_stamp))
+            time_str = self.format_time(stat_info.st_mtime, now, recent)
 
             if self.colors[color] and does_have_colors:
                 filename_str = self.colors[color] + filename + "\x1b[00m"
@@ -186,7 +512,7 @@ class HLLs:
             filename_str += link
 
             table.add_row(
-                [
+                (
                     perms,
                     nlink,
                     name,
@@ -194,50 +520,322 @@ class HLLs:
                     size,
                     time_str,
                     filename_str
-                ]
+                )
             )
 
-        table.align["Permissions"] = 'l'
-        table.align["# Links"] = 'r'
-        table.align["Owner"] = 'l'
-        table.align["Group"] = 'l'
-        table.align["Size"] = 'r'
-        table.align["Last Mod"] = 'l'
-        table.align["Name"] = 'l'
-        print(table)
+        table.finish()
+        return global_status
+
+    def list_names(self, entries: List[Union[os.DirEntry, FileEntry]]) -> int:
+        """ Display the names of the entries one per line (no stat calls are needed) """
+        global_status = self.success
+        renderer = NameRenderer(self.sink)
+        for entry in entries:
+            if isinstance(entry, FileEntry):
+                try:
+                    entry.stat(follow_symlinks=False)
+                except OSError:
+                    renderer.write_pending()
+                    self.sink.write_error(
+                        f"{entry.name}: No such file or directory\n"
+                    )
+                    global_status = self.error
+                    continue
+            renderer.add_name(entry.name)
+        renderer.finish()
+        return global_status
+
+    def parse_options(self, args: List[str], allowed: Optional[FrozenSet[str]] = None) -> Tuple[LsOptions, List[str]]:
+        """
+        Split the arguments of the ls command into it's options and the paths to list, a ValueError is raised for unknown flags.
+        When allowed is provided, the flags that it does not contain are treated as unknown (i.e. TREE_OPTIONS).
+        """
+        options = LsOptions()
+        paths = []
+        only_paths = False
+        arguments = iter(args)
+        for arg in arguments:
+            if only_paths is True or arg == "-" or not arg.startswith("-"):
+                paths.append(arg)
+            elif arg == "--":
+                only_paths = True
+            elif allowed is not None and arg not in allowed:
+                raise ValueError(f"Unknown option: {arg}")
+            elif arg == "-1":
+                options.one_per_line = True
+            elif arg in ("-j", "--jobs"):
+                options.stat_workers = self.parse_number(arg, next(arguments, None))
+            elif arg == "-R":
+                options.recursive = True
+            elif arg in ("-L", "--max-depth"):
+                options.max_depth = self.parse_number(arg, next(arguments, None))
+            elif arg in ("--exclude", "--glob"):
+                pattern = next(arguments, None)
+                if pattern is None:
+                    raise ValueError(f"The option {arg} requires a pattern")
+                if arg == "--exclude":
+                    options.exclude.append(pattern)
+                else:
+                    options.include.append(pattern)
+            elif arg == "-t":
+                options.sort_by = "time"
+            elif arg == "-S":
+                options.sort_by = "size"
+            elif arg == "-r":
+                options.reverse = True
+            elif arg == "--head":
+                options.head = self.parse_number(arg, next(arguments, None))
+            elif arg == "--no-cache":
+                options.use_cache = False
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+        return (options, paths)
+
+    def parse_number(self, option: str, value: Optional[str]) -> int:
+        """ Convert the value of an option to a positive number, a ValueError is raised if it is not one """
+        if value is None or not value.isdigit():
+            raise ValueError(f"The option {option} requires a positive number")
+        return int(value)
+
+    def is_excluded(self, name: str, options: LsOptions) -> bool:
+        """ Check if a name matches one of the exclude patterns """
+        for pattern in options.exclude:
+            if fnmatch.fnmatch(name, pattern):
+                return True
+        return False
+
+    def is_directory(self, entry: Union[os.DirEntry, FileEntry]) -> bool:
+        """ Check if an entry is a directory that can be entered (the symbolic links are not followed) """
+        try:
+            return entry.is_dir(follow_symlinks=False)
+        except OSError:
+            return False
+
+    def open_directory(self, path: str) -> ScannedDirectory:
+        """ Open a directory for a listing (the working directory of the process is never changed) """
+        return ScannedDirectory(path, self.use_directory_fd)
+
+    def filter_level(self, entries: List[Union[os.DirEntry, CachedEntry]], options: LsOptions) -> List[Union[os.DirEntry, CachedEntry]]:
+        """ Return the sorted entries that are not excluded """
+        entries = [
+            entry for entry in entries
+            if not self.is_excluded(entry.name, options)
+        ]
+        entries.sort(key=_name_key)
+        return entries
+
+    def read_level(self, directory: ScannedDirectory, options: LsOptions) -> List[os.DirEntry]:
+        """ Return the sorted entries of a directory that are not excluded """
+        return self.filter_level(directory.scan(), options)
+
+    def get_cached_level(self, path: str, options: LsOptions, directory_stat: Optional[os.stat_result] = None) -> Optional[List[CachedEntry]]:
+        """
+        Return the entries of a directory from the listing cache, the directory is only read again if it changed (otherwise, the directory is only stated).
+        None is returned if an entry could not be stated, so that the caller lists the directory without the cache and reports the failure.
+        """
+        key = os.path.abspath(path)
+        if directory_stat is None:
+            directory_stat = os.stat(path)
+        entries = self.listing_cache.get(key, directory_stat)
+        if entries is not None:
+            return entries
+        entries = []
+        with self.open_directory(path) as directory:
+            scanned = directory.scan()
+            for entry, stat_info in zip(scanned, self.iter_stats(scanned, self.get_workers(options))):
+                if isinstance(stat_info, OSError):
+                    return None
+                entries.append(
+                    CachedEntry(entry.name, directory.get_path(entry), stat_info)
+                )
+        self.listing_cache.put(key, directory_stat, entries)
+        return entries
+
+    def walk(self, path: str, options: LsOptions, on_error: Optional[Callable[[str, OSError], None]] = None) -> Iterator[Tuple[ScannedDirectory, List[os.DirEntry]]]:
+        """
+        Yield the (directory, entries) of a directory and of all it's sub directories (in the order of ls -R), the directory stays open until the next iteration.
+        The walk is iterative and lazy: only the content of the current directory and the paths of the directories left to visit are held in memory.
+        """
+        stack = [(path, 1)]
+        while len(stack) > 0:
+            path, depth = stack.pop()
+            try:
+                directory = self.open_directory(path)
+            except OSError as err:
+                if on_error is not None:
+                    on_error(path, err)
+                continue
+            with directory:
+                try:
+                    entries = self.read_level(directory, options)
+                except OSError as err:
+                    if on_error is not None:
+                        on_error(path, err)
+                    continue
+                yield (directory, entries)
+                if options.max_depth is None or depth < options.max_depth:
+                    sub_directories = [
+                        directory.get_path(entry) for entry in entries
+                        if self.is_directory(entry)
+                    ]
+                    for sub_directory in reversed(sub_directories):
+                        stack.append((sub_directory, depth + 1))
+
+    def read_tree_level(self, path: str, options: LsOptions, on_error: Optional[Callable[[str, OSError], None]] = None) -> Optional[Tuple[ScannedDirectory, List[os.DirEntry]]]:
+        """ Open a directory of the tree and read it's entries (None is returned if it cannot be read) """
+        try:
+            directory = self.open_directory(path)
+        except OSError as err:
+            if on_error is not None:
+                on_error(path, err)
+            return None
+        try:
+            return (directory, self.read_level(directory, options))
+        except OSError as err:
+            directory.close()
+            if on_error is not None:
+                on_error(path, err)
+            return None
+
+    def iter_tree(self, path: str, options: LsOptions, on_error: Optional[Callable[[str, OSError], None]] = None) -> Iterator[Tuple[str, os.DirEntry, bool, str]]:
+        """
+        Yield the (prefix, entry, is_directory, path) of every entry below a directory, in the order they are drawn by tree.
+        Only the entries of the directories that are currently being walked through are held in memory (and only these directories are open).
+        """
+        level = self.read_tree_level(path, options, on_error)
+        if level is None:
+            return
+        stack = [[level[0], level[1], 0, "", 1]]
+        try:
+            while len(stack) > 0:
+                frame = stack[-1]
+                directory, entries, index, prefix, depth = frame
+                if index >= len(entries):
+                    stack.pop()
+                    directory.close()
+                    continue
+                frame[2] += 1
+                entry = entries[index]
+                entry_path = directory.get_path(entry)
+                is_last = index == len(entries) - 1
+                is_directory = self.is_directory(entry)
+                yield (prefix + ("└── " if is_last else "├── "), entry, is_directory, entry_path)
+                if is_directory is False:
+                    continue
+                if options.max_depth is not None and depth >= options.max_depth:
+                    continue
+                level = self.read_tree_level(entry_path, options, on_error)
+                if level is None:
+                    continue
+                stack.append(
+                    [level[0], level[1], 0, prefix + ("    " if is_last else "│   "), depth + 1]
+                )
+        finally:
+            for frame in stack:
+                frame[0].close()
+
+    def list_recursively(self, path: str, options: LsOptions) -> int:
+        """ The ls -R implementation: list a directory and then every one of it's sub directories """
+        global_status = self.success
+
+        def _on_error(directory: str, err: OSError) -> None:
+            nonlocal global_status
+            self.sink.write_error(f"{directory}: {err.strerror}\n")
+            global_status = self.error
+
+        first = True
+        for directory, entries in self.walk(path, options, _on_error):
+            if first is False:
+                self.sink.write("\n")
+            first = False
+            self.sink.write(f"{directory.path}:\n")
+            if self.list_entries(entries, options, directory.fd) != self.success:
+                global_status = self.error
         return global_status
 
-    def ls(self, path: Union[str, list] = "") -> int:
+    def tree(self, path: str = ".", options: Optional[LsOptions] = None) -> int:
+        """ Display the content of a directory and of it's sub directories as a tree """
+        if options is None:
+            options = LsOptions()
+        if not os.path.isdir(path):
+            self.sink.write_error(f"{path}: Not a directory\n")
+            return self.error
+        global_status = self.success
+        directories = 0
+        files = 0
+        renderer = NameRenderer(self.sink)
+        renderer.add_name(path)
+
+        def _on_error(directory: str, err: OSError) -> None:
+            nonlocal global_status
+            renderer.write_pending()
+            self.sink.write_error(f"{directory}: {err.strerror}\n")
+            global_status = self.error
+
+        for prefix, entry, is_directory, entry_path in self.iter_tree(path, options, _on_error):
+            name = entry.name
+            if is_directory:
+                directories += 1
+            else:
+                files += 1
+                if entry.is_symlink():
+                    try:
+                        name += f" -> {os.readlink(entry_path)}"
+                    except OSError:
+                        pass
+            renderer.add_name(prefix + name)
+        renderer.add_name("")
+        renderer.add_name(
+            f"{directories} {'directory' if directories == 1 else 'directories'}, {files} {'file' if files == 1 else 'files'}"
+        )
+        renderer.finish()
+        return global_status
+
+    def list_directory(self, path: str, options: LsOptions, directory_stat: Optional[os.stat_result] = None) -> int:
+        """ List the content of a directory (one level) """
+        if self.listing_cache is not None and options.use_cache:
+            entries = self.get_cached_level(path, options, directory_stat)
+            if entries is not None:
+                return self.list_entries(
+                    self.filter_level(entries, options),
+                    options
+                )
+        with self.open_directory(path) as directory:
+            return self.list_entries(
+                self.read_level(directory, options),
+                options,
+                directory.fd
+            )
+
+    def list_path(self, path: str, options: LsOptions) -> int:
+        """ List a directory (recursively with -R) or a file, the path is only stated once """
+        try:
+            path_stat = os.stat(path)
+        except OSError:
+            return self.list_files([path], options)
+        if not stat.S_ISDIR(path_stat.st_mode):
+            return self.list_files([path], options)
+        if options.recursive:
+            return self.list_recursively(path, options)
+        return self.list_directory(path, options, path_stat)
+
+    def ls(self, path: Union[str, list] = "", options: Optional[LsOptions] = None) -> int:
         """ 
         A basic loop manager to make this P.O.S POC a minimum functional and feel like the core of the real ls
         """
+        if options is None:
+            options = LsOptions()
         try:
-            if path in ("", "."):
-                content = os.listdir(".")
-                return self.list_files(content)
-            if ".." in path:
-                tmp = os.getcwd()
-                os.chdir(path)
-                content = os.listdir(".")
-                status = self.list_files(content)
-                os.chdir(tmp)
-                return status
+            if path == "":
+                path = "."
             if isinstance(path, list):
                 global_status = self.success
                 for item in path:
-                    print(f"Content of: {item}")
-                    content = [item]
-                    if os.path.isdir(item):
-                        content = os.listdir(item)
-                    status = self.list_files(content)
-                    if status != self.success:
+                    self.sink.write(f"Content of: {item}\n")
+                    if self.list_path(item, options) != self.success:
                         global_status = self.error
                 return global_status
-            if os.path.isdir(path):
-                files = os.listdir(path)
-                return self.list_files(files)
-            files = [path]
-            return self.list_files(files)
+            return self.list_path(path, options)
         except Exception as err:
-            print(f"The pseudo Ls has crashed: {err}")
+            self.sink.write_error(f"The pseudo Ls has crashed: {err}\n")
             return self.error
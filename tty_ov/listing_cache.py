@@ -0,0 +1,141 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: listing_cache.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 16:21:09 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of remembering the content of the directories listed by the ls command.
+# // AR
+# +==== END tty_ov =================+
+"""
+import os
+import stat
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+class CachedEntry:
+    """ A directory entry (with the same interface as os.DirEntry) whose stat result was gathered when the directory was listed """
+    __slots__ = ("name", "path", "stat_result")
+
+    def __init__(self, name: str, path: str, stat_result: os.stat_result) -> None:
+        self.name = name
+        self.path = path
+        self.stat_result = stat_result
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        """ Return the lstat result gathered during the listing (links are only followed on demand) """
+        if follow_symlinks is True and self.is_symlink():
+            return os.stat(self.path)
+        return self.stat_result
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        """ Check if the entry is a directory """
+        if follow_symlinks is True and self.is_symlink():
+            try:
+                return stat.S_ISDIR(os.stat(self.path).st_mode)
+            except OSError:
+                return False
+        return stat.S_ISDIR(self.stat_result.st_mode)
+
+    def is_symlink(self) -> bool:
+        """ Check if the entry is a symbolic link """
+        return stat.S_ISLNK(self.stat_result.st_mode)
+
+
+class ListingCache:
+    """
+    A LRU cache of directory listings, keyed by the path of the directory and validated against it's inode and modification time.
+    The size of the cache is bounded by an estimation of the memory used by the entries (max_bytes).
+    Only the directory itself is checked, so the size and dates of the files that were modified in place (without creating, renaming or removing an entry) are refreshed once the directory changes.
+    """
+
+    # ---- The estimated memory used by an entry besides it's name and path (object, stat result, list slot) ----
+    ENTRY_OVERHEAD = 256
+    # ---- A directory modified less than this many nanoseconds ago can still change within the same timestamp, it is not cached ----
+    RACY_DELAY = 2 * 1000 * 1000 * 1000
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        # ---- path -> ((device, inode, mtime_ns), entries, estimated size) ----
+        self.listings: "OrderedDict[str, Tuple[Tuple[int, int, int], List[CachedEntry], int]]" = OrderedDict()
+        self.size = 0
+        # ---- Statistics ----
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def get_signature(self, directory_stat: os.stat_result) -> Tuple[int, int, int]:
+        """ Return the values that change when the content of a directory changes """
+        return (directory_stat.st_dev, directory_stat.st_ino, directory_stat.st_mtime_ns)
+
+    def get(self, path: str, directory_stat: os.stat_result) -> Optional[List[CachedEntry]]:
+        """ Return the cached entries of a directory if it did not change since it was cached """
+        cached = self.listings.get(path)
+        if cached is None or cached[0] != self.get_signature(directory_stat):
+            if cached is not None:
+                self.remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.listings.move_to_end(path)
+        return cached[1]
+
+    def estimate_size(self, entries: List[CachedEntry]) -> int:
+        """ Estimate the memory used by a listing """
+        size = 0
+        for entry in entries:
+            size += self.ENTRY_OVERHEAD + len(entry.name) + len(entry.path)
+        return size
+
+    def put(self, path: str, directory_stat: os.stat_result, entries: List[CachedEntry]) -> bool:
+        """ Store the entries of a directory, False is returned if they were not cached (too big or modified too recently) """
+        if time.time_ns() - directory_stat.st_mtime_ns < self.RACY_DELAY:
+            return False
+        size = self.estimate_size(entries)
+        if size > self.max_bytes:
+            return False
+        self.remove(path)
+        self.listings[path] = (self.get_signature(directory_stat), entries, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            self.remove(next(iter(self.listings)))
+        return True
+
+    def remove(self, path: str) -> None:
+        """ Forget the listing of a directory """
+        cached = self.listings.pop(path, None)
+        if cached is not None:
+            self.size -= cached[2]
+
+    def clear(self) -> None:
+        """ Forget all the listings """
+        self.listings.clear()
+        self.size = 0
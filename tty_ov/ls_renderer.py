@@ -0,0 +1,158 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: ls_renderer.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 15:02:44 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of displaying the listings of the ls command as they are produced.
+# // AR
+# +==== END tty_ov =================+
+"""
+import re
+from typing import List, Sequence
+from .output import OutputSink
+
+# The colour escape sequences do not take any room on the screen
+ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def visible_length(text: str) -> int:
+    """ Return the number of characters of a text once displayed (the colour escape sequences are ignored) """
+    if "\x1b" not in text:
+        return len(text)
+    return len(ESCAPE_PATTERN.sub("", text))
+
+
+class TableRenderer:
+    """
+    The class in charge of displaying a table (with the same look as PrettyTable) while the rows are still being produced.
+    The width of the columns is computed from the first sample_size rows, after that, the rows are written in batches of batch_size rows.
+    The widths are fixed once the header is written: a later cell that is wider than it's column spills past the border of it's own row, the other rows stay aligned with the header.
+    """
+
+    def __init__(self, sink: OutputSink, headers: Sequence[str], alignments: Sequence[str], sample_size: int = 256, batch_size: int = 256) -> None:
+        self.sink = sink
+        self.headers = list(headers)
+        self.alignments = list(alignments)
+        self.sample_size = sample_size
+        self.batch_size = batch_size
+        self.widths = [len(header) for header in self.headers]
+        # ---- The rows waiting for the widths to be known ----
+        self.sample: List[Sequence[str]] = []
+        self.pending: List[str] = []
+        self.started = False
+
+    def get_separator(self) -> str:
+        """ Return the line drawn above and under the header and at the bottom of the table """
+        return "+" + "+".join("-" * (width + 2) for width in self.widths) + "+"
+
+    def format_row(self, row: Sequence[str], header: bool = False) -> str:
+        """ Convert a row to a line of the table """
+        cells = []
+        for index, cell in enumerate(row):
+            width = self.widths[index]
+            padding = max(width - visible_length(cell), 0)
+            if header:
+                left = padding // 2
+                cells.append(" " * left + cell + " " * (padding - left))
+            elif self.alignments[index] == "r":
+                cells.append(" " * padding + cell)
+            else:
+                cells.append(cell + " " * padding)
+        return "| " + " | ".join(cells) + " |"
+
+    def start(self) -> None:
+        """ Compute the width of the columns from the sample and write the header followed by the sampled rows """
+        for row in self.sample:
+            for index, cell in enumerate(row):
+                length = visible_length(cell)
+                if length > self.widths[index]:
+                    self.widths[index] = length
+        separator = self.get_separator()
+        self.pending.extend(
+            (separator, self.format_row(self.headers, True), separator)
+        )
+        for row in self.sample:
+            self.pending.append(self.format_row(row))
+        self.sample = []
+        self.started = True
+        self.write_pending()
+
+    def write_pending(self) -> None:
+        """ Write the lines that are ready """
+        if len(self.pending) == 0:
+            return
+        self.pending.append("")
+        self.sink.write("\n".join(self.pending))
+        self.sink.flush()
+        self.pending = []
+
+    def add_row(self, row: Sequence[str]) -> None:
+        """ Add a row to the table, it is displayed as soon as the width of the columns is known """
+        if self.started is False:
+            self.sample.append(row)
+            if len(self.sample) >= self.sample_size:
+                self.start()
+            return
+        self.pending.append(self.format_row(row))
+        if len(self.pending) >= self.batch_size:
+            self.write_pending()
+
+    def finish(self) -> None:
+        """ Write the remaining rows and the bottom of the table """
+        if self.started is False:
+            self.start()
+        self.pending.append(self.get_separator())
+        self.write_pending()
+
+
+class NameRenderer:
+    """ The renderer of the '-1' mode: one name per line, written in batches """
+
+    def __init__(self, sink: OutputSink, batch_size: int = 1024) -> None:
+        self.sink = sink
+        self.batch_size = batch_size
+        self.pending: List[str] = []
+
+    def add_name(self, name: str) -> None:
+        """ Add a name to the listing """
+        self.pending.append(name)
+        if len(self.pending) >= self.batch_size:
+            self.write_pending()
+
+    def write_pending(self) -> None:
+        """ Write the names that are waiting """
+        if len(self.pending) == 0:
+            return
+        self.pending.append("")
+        self.sink.write("\n".join(self.pending))
+        self.sink.flush()
+        self.pending = []
+
+    def finish(self) -> None:
+        """ Write the remaining names """
+        self.write_pending()
@@ -0,0 +1,279 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: output.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 12:58:09 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of gathering the text displayed by the commands and sending it to it's destination (terminal, memory, file, nowhere).
+# // AR
+# +==== END tty_ov =================+
+"""
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import IO, Deque, List, Optional, TextIO
+
+
+class OutputSink(ABC):
+    """ The base class of the destinations of the text displayed by the shell """
+
+    @abstractmethod
+    def write(self, text: str) -> None:
+        """ Write text on the standard output of the sink """
+
+    def write_error(self, text: str) -> None:
+        """ Write text on the error output of the sink (the standard output by default) """
+        self.write(text)
+
+    def flush(self) -> None:
+        """ Make sure the written text reached it's destination """
+        return
+
+    def isatty(self) -> bool:
+        """ Tell if the sink is an interactive terminal (the colours are only sent to terminals) """
+        return False
+
+    def close(self) -> None:
+        """ Free the ressources held by the sink """
+        return
+
+
+class TerminalSink(OutputSink):
+    """ The sink writing to the terminal (sys.stdout and sys.stderr are looked up on every write unless streams are provided) """
+
+    def __init__(self, stream: Optional[TextIO] = None, error_stream: Optional[TextIO] = None) -> None:
+        self.stream = stream
+        self.error_stream = error_stream
+
+    def get_stream(self) -> TextIO:
+        """ Return the stream used for the standard output """
+        if self.stream is None:
+            return sys.stdout
+        return self.stream
+
+    def get_error_stream(self) -> TextIO:
+        """ Return the stream used for the error output """
+        if self.error_stream is None:
+            return sys.stderr
+        return self.error_stream
+
+    def write(self, text: str) -> None:
+        self.get_stream().write(text)
+
+    def write_error(self, text: str) -> None:
+        self.get_stream().flush()
+        error_stream = self.get_error_stream()
+        error_stream.write(text)
+        error_stream.flush()
+
+    def flush(self) -> None:
+        self.get_stream().flush()
+
+    def isatty(self) -> bool:
+        stream = self.get_stream()
+        return hasattr(stream, "isatty") and stream.isatty()
+
+
+class MemorySink(OutputSink):
+    """
+    The sink keeping the text in memory.
+    When max_size is above 0, the sink behaves like a ring buffer: only the last max_size characters of each output are kept.
+    """
+
+    def __init__(self, max_size: int = 1024 * 1024) -> None:
+        self.max_size = max_size
+        self.chunks: Deque[str] = deque()
+        self.size = 0
+        self.error_chunks: Deque[str] = deque()
+        self.error_size = 0
+
+    def _append(self, chunks: Deque[str], size: int, text: str) -> int:
+        """ Add a chunk to a ring and drop the oldest text if the ring is full, the new size of the ring is returned """
+        chunks.append(text)
+        size += len(text)
+        if self.max_size <= 0:
+            return size
+        while size > self.max_size:
+            oldest = chunks[0]
+            overflow = size - self.max_size
+            if len(oldest) <= overflow:
+                chunks.popleft()
+                size -= len(oldest)
+            else:
+                chunks[0] = oldest[overflow:]
+                size -= overflow
+        return size
+
+    def write(self, text: str) -> None:
+        if text == "":
+            return
+        self.size = self._append(self.chunks, self.size, text)
+
+    def write_error(self, text: str) -> None:
+        if text == "":
+            return
+        self.error_size = self._append(self.error_chunks, self.error_size, text)
+
+    def getvalue(self) -> str:
+        """ Return the text written on the standard output """
+        return "".join(self.chunks)
+
+    def get_errors(self) -> str:
+        """ Return the text written on the error output """
+        return "".join(self.error_chunks)
+
+    def clear(self) -> None:
+        """ Forget the stored text """
+        self.chunks.clear()
+        self.error_chunks.clear()
+        self.size = 0
+        self.error_size = 0
+
+
+class FileSink(OutputSink):
+    """ The sink appending the text to a file (the errors are appended to the same file) """
+
+    def __init__(self, file_path: str, encoding: str = "utf-8") -> None:
+        self.file_path = file_path
+        self.file = open(file_path, "a", encoding=encoding, newline="\n")
+
+    def write(self, text: str) -> None:
+        self.file.write(text)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.file.closed is False:
+            self.file.close()
+
+
+class NullSink(OutputSink):
+    """ The sink discarding everything that is written to it """
+
+    def write(self, text: str) -> None:
+        return
+
+    def write_error(self, text: str) -> None:
+        return
+
+
+class OutputSpool(OutputSink):
+    """
+    The sink placed in front of the terminal while a command runs.
+    The text goes straight to the terminal until threshold characters were written, after that, the rest of the output is stored in a temporary file so that it can be read through the pager instead of being pushed to the terminal (like less -F).
+    """
+
+    def __init__(self, target: OutputSink, threshold: int = 1024 * 1024, encoding: str = "utf-8") -> None:
+        self.target = target
+        self.threshold = threshold
+        self.encoding = encoding
+        # ---- The number of characters that were sent to the terminal ----
+        self.size = 0
+        self.file: Optional[IO[bytes]] = None
+
+    def is_spooled(self) -> bool:
+        """ Tell if the rest of the output is stored in the temporary file """
+        return self.file is not None
+
+    def spill(self) -> None:
+        """ Send the following text to the temporary file """
+        self.target.flush()
+        self.file = tempfile.TemporaryFile()
+
+    def write(self, text: str) -> None:
+        if self.file is None and self.size + len(text) > self.threshold:
+            self.spill()
+        if self.file is not None:
+            self.file.write(text.encode(self.encoding, errors="replace"))
+            return
+        self.target.write(text)
+        self.size += len(text)
+
+    def write_error(self, text: str) -> None:
+        self.target.write_error(text)
+
+    def flush(self) -> None:
+        if self.file is not None:
+            self.file.flush()
+        else:
+            self.target.flush()
+
+    def release(self) -> None:
+        """ Make sure the text sent to the terminal is displayed """
+        self.target.flush()
+
+    def isatty(self) -> bool:
+        return self.target.isatty()
+
+    def close(self) -> None:
+        """ Delete the temporary file """
+        self.release()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class OutputBuffer:
+    """
+    The class in charge of gathering the fragments of text displayed during a command.
+    The fragments are written to the sink in a single call when the command finishes (or when the buffer grows past flush_threshold characters).
+    """
+
+    def __init__(self, sink: Optional[OutputSink] = None, flush_threshold: int = 64 * 1024) -> None:
+        if sink is None:
+            sink = TerminalSink()
+        self.sink = sink
+        self.flush_threshold = flush_threshold
+        self.fragments: List[str] = []
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def write(self, text: str) -> None:
+        """ Add a fragment of text to the buffer """
+        self.fragments.append(text)
+        self.size += len(text)
+        if self.size >= self.flush_threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Write the buffered fragments in a single call """
+        if len(self.fragments) == 0:
+            return
+        text = "".join(self.fragments)
+        self.fragments = []
+        self.size = 0
+        self.sink.write(text)
+        self.sink.flush()
+
+    def discard(self) -> None:
+        """ Drop the buffered fragments without writing them """
+        self.fragments = []
+        self.size = 0
@@ -0,0 +1,175 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: pager.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 13:47:30 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of displaying huge outputs one screen at a time.
+# // AR
+# +==== END tty_ov =================+
+"""
+import mmap
+import shutil
+from typing import IO, Callable, List, Optional
+from .output import OutputSink
+
+
+class LazyPager:
+    """
+    A pager reading a spooled output through a memory map.
+    Only the lines of the visible window are decoded, and the position of every checkpoint_interval-th line is remembered so that jumping around does not require an index of every line.
+    """
+
+    def __init__(self, file: IO[bytes], sink: OutputSink, input_function: Callable[[str], str] = input, page_height: Optional[int] = None, checkpoint_interval: int = 1024, encoding: str = "utf-8") -> None:
+        self.file = file
+        self.sink = sink
+        self.input_function = input_function
+        if page_height is None:
+            page_height = max(shutil.get_terminal_size().lines - 1, 1)
+        self.page_height = page_height
+        self.checkpoint_interval = checkpoint_interval
+        self.encoding = encoding
+        self.map: Optional[mmap.mmap] = None
+        # ---- checkpoints[i] = offset of the line i * checkpoint_interval ----
+        self.checkpoints = [0]
+        # ---- The furthest line whose offset is known ----
+        self.scanned_line = 0
+        self.scanned_offset = 0
+        # ---- The number of lines (None until the end of the file was reached) ----
+        self.total_lines: Optional[int] = None
+
+    def open(self) -> bool:
+        """ Map the file in memory, False is returned if the file is empty """
+        self.file.flush()
+        self.file.seek(0, 2)
+        if self.file.tell() == 0:
+            return False
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return True
+
+    def close(self) -> None:
+        """ Unmap the file """
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def scan_to(self, line: int) -> None:
+        """ Move the scanned position forward until 'line' (or the end of the file) is reached """
+        size = len(self.map)
+        while self.scanned_line < line and self.total_lines is None:
+            index = self.map.find(b"\n", self.scanned_offset)
+            if index == -1 or index + 1 >= size:
+                self.total_lines = self.scanned_line + 1
+                return
+            self.scanned_offset = index + 1
+            self.scanned_line += 1
+            if self.scanned_line % self.checkpoint_interval == 0:
+                self.checkpoints.append(self.scanned_offset)
+
+    def count_lines(self) -> int:
+        """ Return the number of lines of the output (the whole file is scanned once) """
+        if self.total_lines is None:
+            self.scan_to(len(self.map) + 1)
+        return self.total_lines
+
+    def line_offset(self, line: int) -> int:
+        """ Return the offset of the beginning of a line, starting from the closest checkpoint """
+        self.scan_to(line)
+        if self.total_lines is not None:
+            line = min(line, self.total_lines - 1)
+        checkpoint = line // self.checkpoint_interval
+        offset = self.checkpoints[checkpoint]
+        for _ in range(line - checkpoint * self.checkpoint_interval):
+            offset = self.map.find(b"\n", offset) + 1
+        return offset
+
+    def get_lines(self, start: int, count: int) -> List[str]:
+        """ Return 'count' lines starting from the line 'start' """
+        lines = []
+        offset = self.line_offset(start)
+        size = len(self.map)
+        while len(lines) < count and offset < size:
+            index = self.map.find(b"\n", offset)
+            if index == -1:
+                index = size - 1
+            lines.append(
+                self.map[offset:index + 1].decode(
+                    self.encoding,
+                    errors="replace"
+                )
+            )
+            offset = index + 1
+        self.scan_to(start + count)
+        return lines
+
+    def display_page(self, top: int) -> None:
+        """ Write the lines of the window starting at 'top' """
+        text = "".join(self.get_lines(top, self.page_height))
+        if not text.endswith("\n"):
+            text += "\n"
+        self.sink.write(text)
+        self.sink.flush()
+
+    def get_prompt(self, top: int) -> str:
+        """ Return the text of the prompt displayed under the window """
+        last = top + self.page_height
+        if self.total_lines is not None:
+            last = min(last, self.total_lines)
+            return f"-- lines {top + 1}-{last}/{self.total_lines} (Enter: next, b: back, g/G: top/end, <n>: line, q: quit) --"
+        return f"-- lines {top + 1}-{last} (Enter: next, b: back, g/G: top/end, <n>: line, q: quit) --"
+
+    def run(self) -> None:
+        """ Display the output one window at a time until the user quits or reaches the end """
+        if self.open() is False:
+            return
+        try:
+            top = 0
+            while True:
+                self.display_page(top)
+                if self.total_lines is not None and top + self.page_height >= self.total_lines:
+                    return
+                try:
+                    choice = self.input_function(self.get_prompt(top)).strip()
+                except (EOFError, KeyboardInterrupt):
+                    return
+                if choice in ("q", "Q"):
+                    return
+                if choice == "b":
+                    top = max(top - self.page_height, 0)
+                elif choice == "g":
+                    top = 0
+                elif choice == "G":
+                    top = max(self.count_lines() - self.page_height, 0)
+                elif choice.isdigit():
+                    top = max(int(choice) - 1, 0)
+                    self.scan_to(top + self.page_height)
+                    if self.total_lines is not None:
+                        top = min(top, max(self.total_lines - self.page_height, 0))
+                else:
+                    top += self.page_height
+        finally:
+            self.close()
@@ -0,0 +1,216 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: script_cache.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 12:03:15 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of compiling the script files and caching the result on the disk.
+# // AR
+# +==== END tty_ov =================+
+"""
+import os
+import json
+import hashlib
+import tempfile
+from typing import List, Optional, Tuple
+from .tokenizer import ParsedCommand, tokenize_line
+
+# Bump this when the format of the cached plans changes so that old plans are ignored
+PLAN_FORMAT_VERSION = 1
+
+
+class ScriptPlanCache:
+    """
+    The class in charge of converting a script file into the list of commands to run (a plan).
+    The plans are stored on the disk, keyed by the hash of the content of the script (and the tokens used to parse it), so a script that did not change is never tokenized twice.
+    """
+
+    def __init__(self, cache_directory: Optional[str] = None, enabled: bool = True, max_plans: int = 256) -> None:
+        if cache_directory is None:
+            cache_directory = self.get_default_cache_directory()
+        self.cache_directory = cache_directory
+        self.enabled = enabled
+        # ---- The least recently used plans are removed once there are more than max_plans (0 = no limit) ----
+        self.max_plans = max_plans
+        # ---- Statistics ----
+        self.hits = 0
+        self.misses = 0
+
+    def get_default_cache_directory(self) -> str:
+        """ Return the directory in which the plans are stored by default """
+        if "XDG_CACHE_HOME" in os.environ:
+            base = os.environ["XDG_CACHE_HOME"]
+        elif "LOCALAPPDATA" in os.environ:
+            base = os.environ["LOCALAPPDATA"]
+        else:
+            base = os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "tty_ov", "plans")
+
+    def hash_file(self, file_path: str, command_seperator_token: str, comment_token: str) -> str:
+        """ Hash the content of the script along with the tokens that change the way it is parsed """
+        digest = hashlib.sha256()
+        digest.update(
+            f"{PLAN_FORMAT_VERSION}\0{command_seperator_token}\0{comment_token}\0".encode(
+                "utf-8"
+            )
+        )
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_plan_path(self, key: str) -> str:
+        """ Return the path of the file containing a cached plan """
+        return os.path.join(self.cache_directory, f"{key}.json")
+
+    def compile_file(self, file_path: str, command_seperator_token: str, comment_token: str) -> List[ParsedCommand]:
+        """ Tokenize every line of a script """
+        plan = []
+        with open(file_path, "r", encoding="utf-8", newline=None) as file:
+            for line in file:
+                plan.extend(
+                    tokenize_line(
+                        line,
+                        command_seperator_token,
+                        comment_token
+                    )
+                )
+        return plan
+
+    def load_plan(self, key: str) -> Optional[List[ParsedCommand]]:
+        """ Load a plan from the disk (None if it is not cached or unreadable) """
+        try:
+            with open(self.get_plan_path(key), "r", encoding="utf-8") as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(content, list):
+            return None
+        plan = []
+        for item in content:
+            if self.is_valid_item(item) is False:
+                return None
+            plan.append(ParsedCommand(item[0], tuple(item[1])))
+        try:
+            # ---- Mark the plan as recently used so that prune keeps it ----
+            os.utime(self.get_plan_path(key))
+        except OSError:
+            pass
+        return plan
+
+    def is_valid_item(self, item: object) -> bool:
+        """ Check that a cached item has the [command, [arguments...]] format """
+        if not isinstance(item, list) or len(item) != 2:
+            return False
+        if not isinstance(item[0], str) or not isinstance(item[1], list):
+            return False
+        return all(isinstance(i, str) for i in item[1])
+
+    def save_plan(self, key: str, plan: List[ParsedCommand]) -> bool:
+        """ Store a plan on the disk, the file is written atomically so that concurrent runs never read a partial plan """
+        content = [[i.command, list(i.args)] for i in plan]
+        try:
+            os.makedirs(self.cache_directory, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                dir=self.cache_directory,
+                suffix=".tmp"
+            )
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                json.dump(content, file)
+            os.replace(temporary_path, self.get_plan_path(key))
+        except OSError:
+            return False
+        self.prune()
+        return True
+
+    def prune(self) -> int:
+        """ Remove the least recently used plans until at most max_plans remain, the number of removed plans is returned """
+        if self.max_plans <= 0:
+            return 0
+        plans = []
+        try:
+            with os.scandir(self.cache_directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        plans.append((entry.stat().st_mtime_ns, entry.path))
+                    except OSError:
+                        continue
+        except OSError:
+            return 0
+        if len(plans) <= self.max_plans:
+            return 0
+        plans.sort()
+        removed = 0
+        for _, path in plans[:len(plans) - self.max_plans]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def get_plan(self, file_path: str, command_seperator_token: str = "@#", comment_token: str = "--") -> Tuple[List[ParsedCommand], bool]:
+        """ Return the plan of a script and whether it came from the cache, an OSError is raised if the script cannot be read """
+        if self.enabled is False:
+            self.misses += 1
+            return (self.compile_file(file_path, command_seperator_token, comment_token), False)
+        key = self.hash_file(
+            file_path,
+            command_seperator_token,
+            comment_token
+        )
+        plan = self.load_plan(key)
+        if plan is not None:
+            self.hits += 1
+            return (plan, True)
+        self.misses += 1
+        plan = self.compile_file(
+            file_path,
+            command_seperator_token,
+            comment_token
+        )
+        self.save_plan(key, plan)
+        return (plan, False)
+
+    def clear(self) -> int:
+        """ Remove the plans stored on the disk, the number of removed plans is returned """
+        removed = 0
+        try:
+            entries = os.listdir(self.cache_directory)
+        except OSError:
+            return removed
+        for name in entries:
+            if not name.endswith(".json"):
+                continue
+            try:
+                os.remove(os.path.join(self.cache_directory, name))
+                removed += 1
+            except OSError:
+                continue
+        return removed
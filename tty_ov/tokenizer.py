@@ -0,0 +1,178 @@
+"""
+# +==== BEGIN tty_ov =================+
+# LOGO:
+# ..@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
+# .@...........................#@
+# @############################.@
+# @...........................@.@
+# @..#######################..@.@
+# @.#########################.@.@
+# @.##>_#####################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @.#########################.@.@
+# @..#######################..@.@
+# @...........................@.@
+# @..+----+______________.....@.@
+# @..+....+______________+....@.@
+# @..+----+...................@.@
+# @...........................@.#
+# @@@@@@@@@@@@@@@@@@@@@@@@@@@@@#.
+# /STOP
+# PROJECT: tty_ov
+# FILE: tokenizer.py
+# CREATION DATE: 17-10-2026
+# LAST Modified: 11:20:48 17-10-2026
+# DESCRIPTION:
+# A module that emulates a few core functionalities of a tty (see the inner help for a list of functions).
+# /STOP
+# COPYRIGHT: (c) Henry Letellier
+# PURPOSE: This is the file in charge of splitting the user input into commands and arguments.
+# // AR
+# +==== END tty_ov =================+
+"""
+import re
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Tuple
+
+# A word is a run of non blank characters and quoted sections ("a b" or 'a b'), an unterminated quote runs to the end of the line
+WORD_PATTERN = re.compile(r"""(?:[^\s"']+|"[^"]*"?|'[^']*'?)+""")
+# The quoted sections inside of a word
+QUOTE_PATTERN = re.compile(r""""([^"]*)"?|'([^']*)'?""")
+
+
+class ParsedCommand:
+    """ A command and it's arguments, as produced by the tokenizer """
+    __slots__ = ("command", "args")
+
+    def __init__(self, command: str, args: Tuple[str, ...] = ()) -> None:
+        self.command = command
+        self.args = args
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ParsedCommand):
+            return NotImplemented
+        return self.command == other.command and self.args == other.args
+
+    def __repr__(self) -> str:
+        return f"ParsedCommand({self.command!r}, {self.args!r})"
+
+    def to_string(self) -> str:
+        """ Convert the command back to a line of text """
+        return " ".join((self.command,) + self.args)
+
+
+def _unquote(match: re.Match) -> str:
+    """ Return the content of a quoted section """
+    if match.group(1) is not None:
+        return match.group(1)
+    return match.group(2)
+
+
+def iter_words(line: str) -> Iterator[Tuple[str, bool]]:
+    """ Yield the words of a line (without their quotes) along with a flag telling if the word contained quotes """
+    for match in WORD_PATTERN.finditer(line):
+        word = match.group(0)
+        if '"' in word or "'" in word:
+            yield (QUOTE_PATTERN.sub(_unquote, word), True)
+        else:
+            yield (word, False)
+
+
+def group_commands(words: Iterable[Tuple[str, bool]], command_seperator_token: str = "@#", comment_token: str = "--") -> List[ParsedCommand]:
+    """
+    Group a sequence of (word, is_quoted) into commands in a single pass.
+    A word equal to the command seperator starts a new command and a word equal to the comment token ignores the rest of the command (up to the next seperator).
+    Quoted words are never considered as seperators or comments.
+    """
+    commands = []
+    current = []
+    in_comment = False
+    for word, is_quoted in words:
+        if is_quoted is False:
+            if word == command_seperator_token:
+                if len(current) > 0:
+                    commands.append(
+                        ParsedCommand(current[0], tuple(current[1:]))
+                    )
+                current = []
+                in_comment = False
+                continue
+            if word == comment_token:
+                in_comment = True
+                continue
+        if in_comment is False:
+            current.append(word)
+    if len(current) > 0:
+        commands.append(ParsedCommand(current[0], tuple(current[1:])))
+    return commands
+
+
+def tokenize_words(words: Iterable[str], command_seperator_token: str = "@#", comment_token: str = "--") -> List[ParsedCommand]:
+    """ Group words that were already split (i.e. sys.argv) into commands, the quotes were already removed by the calling shell """
+    return group_commands(
+        ((word, False) for word in words),
+        command_seperator_token,
+        comment_token
+    )
+
+
+def tokenize_line(line: str, command_seperator_token: str = "@#", comment_token: str = "--") -> List[ParsedCommand]:
+    """ Convert a line of text into the list of commands that it contains in a single pass """
+    return group_commands(
+        iter_words(line),
+        command_seperator_token,
+        comment_token
+    )
+
+
+class ParseCache:
+    """
+    A bounded LRU cache of the parsed form of the lines that were typed, so that a line that is sent again and again is only tokenized once.
+    The key contains the tokens that were active during the parsing, the cache must however be cleared when they change to free the stale entries.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str, str], Tuple[ParsedCommand, ...]]" = OrderedDict()
+        # ---- Statistics (for tuning the size of the cache) ----
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, line: str, command_seperator_token: str = "@#", comment_token: str = "--") -> Tuple[ParsedCommand, ...]:
+        """ Return the commands contained in the line, tokenizing it only if it is not already cached """
+        key = (line, command_seperator_token, comment_token)
+        commands = self.entries.get(key)
+        if commands is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return commands
+        self.misses += 1
+        commands = tuple(
+            tokenize_line(line, command_seperator_token, comment_token)
+        )
+        if self.max_entries > 0:
+            self.entries[key] = commands
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return commands
+
+    def clear(self) -> None:
+        """ Remove all the cached lines (the statistics are kept) """
+        self.entries.clear()
+
+    def reset_statistics(self) -> None:
+        """ Reset the hit and miss counters """
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        """ Return the ratio of lookups that were served from the cache (between 0 and 1) """
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
@@ -34,30 +34,46 @@
 """
 import os
 import sys
+import time
 import shutil
-from typing import List, Dict
+from typing import List, Dict, Tuple, Union, Callable, TextIO, Optional
 import prompt_toolkit
+from prompt_toolkit.filters import Condition
 from prompt_toolkit.key_binding import KeyBindings
-from prompt_toolkit.history import InMemoryHistory
 from ask_question import AskQuestion
 from colourise_output import ColouriseOutput
-from .hl_ls import HLLs
+from .hl_ls import HLLs, TREE_OPTIONS
+from .command_registry import CommandRegistry
+from .completion import CommandCompleter
+from .tokenizer import ParsedCommand, ParseCache, tokenize_words
+from .script_cache import ScriptPlanCache
+from .execution import ExecutionResult
+from .output import OutputBuffer, OutputSink, OutputSpool, TerminalSink, MemorySink
+from .pager import LazyPager
+from .history import CommandHistory, HistoryFile, PromptHistory
 
 
 class TTY:
     """ The class in charge of simulating a tty """
 
-    def __init__(self, err: int, error: int, success: int, colour_lib: ColouriseOutput, ask_question: AskQuestion, colours: Dict, colourise_output: bool = True) -> None:
+    def __init__(self, err: int, error: int, success: int, colour_lib: ColouriseOutput, ask_question: AskQuestion, colours: Dict, colourise_output: bool = True, output_sink: Optional[OutputSink] = None, history_capacity: int = 10000, history_file: Optional[str] = None) -> None:
         # ---- The version of the program ----
         self.__version__ = "1.0.0"
         # ---- TTY general info ----
         self.program_version = self.__version__
         self.client_name = "(c) OpenValue"
         self.program_author = "(c) Henry Letellier"
-        # ---- Command history ----
-        self.history = []
-        self.prompt_history = InMemoryHistory()
-        self.history_index = 0
+        # ---- Command history (the oldest commands are dropped once history_capacity is reached) ----
+        self.history = CommandHistory(history_capacity)
+        if history_file is not None:
+            self.history.set_history_file(HistoryFile(history_file))
+        self.prompt_history = PromptHistory(self.history)
+        # ---- Reverse incremental search (ctrl+r) state, the matches come from the search index of the history ----
+        self.history_search_active = False
+        self.history_search_text = ""
+        self.history_search_match = None
+        self.history_search_number = None
+        self.history_search_original = ""
         # ---- The status codes ----
         self.success = success
         self.err = err
@@ -69,7 +85,7 @@ class TTY:
         self.colour_lib = colour_lib
         self.ask_question = ask_question
         # ---- The commands of the layer in which the TTY is currently located ----
-        self.options = []
+        self.options = CommandRegistry()
         # ---- Available TTY colours ----
         self.colours = self.colour_lib.unix_colour_pallet
         self.tty_colours = colours
@@ -98,6 +114,10 @@ class TTY:
         self.help_description_colour = None
         # ---- Colour toggle ----
         self.colourise_output = colourise_output
+        # ---- Colour code -> escape sequence (resolved once in load_basics) ----
+        self.colour_escapes = {}
+        # ---- The colours are only sent when the output is a terminal ----
+        self.output_is_tty = True
         # ---- Environement variables colours ----
         self.env_term_colour = None
         self.env_shell_colour = None
@@ -108,33 +128,106 @@ class TTY:
         # ---- cd management ----
         self.old_pwd = os.getcwd()
         self.home = None
+        # ---- The destination of the text displayed by the shell ----
+        if output_sink is None:
+            output_sink = TerminalSink()
+        self.output_sink = output_sink
         # ---- A tiny ls implementation ----
-        self.ls = HLLs(self.success, self.error)
+        self.ls = HLLs(self.success, self.error, self.output_sink)
         # ---- Master session name ----
         self.master_session = "main"
         # ---- Argument command tracking ----
         self.command_seperator_token = "@#"
         # ---- Comment Tracking ----
         self.comment_token = "--"
+        # ---- The parsed form of the lines that were recently typed ----
+        self.parse_cache = ParseCache()
+        # ---- The compiled form of the scripts that were run ----
+        self.script_cache = ScriptPlanCache()
+        # ---- The real paths of the scripts being run (a script cannot source itself, directly or not) ----
+        self.running_scripts = set()
         # ---- Pipe input ----
         self.pipe_input = None
+        self.pipe_max_line_length = 1024 * 1024
+        self.record_pipe_history = False
         # ---- Working on the auto-complete functionalities ----
-        self.auto_complete_list = []
+        self.command_completer = CommandCompleter(
+            self.options,
+            self.command_seperator_token
+        )
         self.auto_complete_index = 0
         self.auto_complete_usr_input = ""
         self.auto_complete_default_usr_input = ""
         # ---- TTY command description token inner ----
         self.command_description_token_inner = "desc"
+        # ---- The text displayed by a command is written in one go when it finishes ----
+        self.output_buffer = OutputBuffer(self.output_sink)
+        self.output_buffer_depth = 0
+        # ---- Once a command displayed spool_threshold characters, the rest of it's output is displayed through the pager (0 to disable) ----
+        self.enable_pager = True
+        self.spool_threshold = 1024 * 1024
+        self.output_spool = None
 
     def print_on_tty(self, colour: str, string: str) -> None:
         """ The function in charge of displaying a string on the tty """
-        if self.colourise_output:
-            self.colour_lib.display(colour, (), string)
+        if self.colourise_output and self.output_is_tty:
+            self.output_buffer.write(
+                self.colour_escapes.get(colour, "") + string
+            )
         else:
-            print(string, end="")
+            self.output_buffer.write(string)
+        if self.output_buffer_depth == 0:
+            self.output_buffer.flush()
+
+    def flush_output(self) -> None:
+        """ Write the text that is waiting in the output buffer """
+        self.output_buffer.flush()
+        if self.output_spool is not None:
+            self.output_spool.release()
+
+    def can_use_pager(self) -> bool:
+        """ Check if the output of the command that is about to run can be sent to the pager """
+        if self.enable_pager is False or self.spool_threshold <= 0:
+            return False
+        if self.output_buffer_depth > 0 or self.output_spool is not None:
+            return False
+        return self.output_is_tty and sys.stdin.isatty()
+
+    def start_output_spool(self) -> None:
+        """ Place the spool between the commands and the terminal """
+        self.output_spool = OutputSpool(self.output_sink, self.spool_threshold)
+        self.output_buffer.sink = self.output_spool
+        self.ls.sink = self.output_spool
+
+    def stop_output_spool(self) -> None:
+        """ Remove the spool, if the output was too big, the part that did not reach the terminal is displayed through the pager """
+        spool = self.output_spool
+        self.output_buffer.flush()
+        self.output_buffer.sink = self.output_sink
+        self.ls.sink = self.output_sink
+        self.output_spool = None
+        if spool.is_spooled():
+            spool.flush()
+            pager = LazyPager(spool.file, self.output_sink)
+            try:
+                pager.run()
+            except (OSError, ValueError) as err:
+                self.output_sink.write_error(f"Failed to display the output: {err}\n")
+        spool.close()
+
+    def set_output_sink(self, output_sink: OutputSink) -> OutputSink:
+        """ Change the destination of the text displayed by the shell (and the ls command), the previous sink is returned """
+        self.flush_output()
+        previous_sink = self.output_sink
+        self.output_sink = output_sink
+        self.output_buffer.sink = output_sink
+        self.ls.sink = output_sink
+        self.output_is_tty = output_sink.isatty()
+        return previous_sink
 
     def run_external_command(self, command: str) -> int:
         """ The function in charge of executing command on the host system in a contained manner """
+        self.flush_output()
         try:
             return os.system(command)
         except IOError:
@@ -176,21 +269,52 @@ Output:
         if self.help_function_child_name == func_name:
             help_description = f"""
 Display the history of the commands.
+Only the last {self.history.capacity} commands are kept.
+If '-n' and a number are passed, only the last commands are displayed.
+If two numbers are passed, the commands between these numbers (both included) are displayed.
 Usage Example:
 Input:
     {func_name}
 Output:
     The history of the commands
+Input:
+    {func_name} -n 2
+Output:
+    The last 2 commands
+Input:
+    {func_name} 10 20
+Output:
+    The commands number 10 to 20
 """
             self.function_help(func_name, help_description)
             self.current_tty_status = self.success
             return self.success
+        try:
+            if len(args) == 0:
+                entries = self.history.tail(len(self.history))
+            elif len(args) == 2 and args[0] == "-n":
+                entries = self.history.tail(int(args[1]))
+            elif len(args) == 2:
+                entries = self.history.get_range(int(args[0]), int(args[1]))
+            else:
+                raise ValueError
+        except ValueError:
+            self.print_on_tty(
+                self.error_colour,
+                f"Invalid option: {self.list_to_str(args)}\n"
+            )
+            self.print_on_tty(
+                self.error_colour,
+                f"Usage: {func_name} [-n COUNT | FROM TO]\n"
+            )
+            self.current_tty_status = self.error
+            return self.error
         self.print_on_tty(
             self.default_colour,
             "The history of the commands:\n"
         )
-        if len(self.history) > 0:
-            for index, command in enumerate(self.history):
+        if len(entries) > 0:
+            for index, command in entries:
                 self.print_on_tty(self.help_command_colour, f"{index}")
                 self.print_on_tty(self.help_title_colour, ": ")
                 self.print_on_tty(
@@ -374,6 +498,7 @@ Output:
                 self.input_split_char
             )
         if arg_length == 0:
+            self.flush_output()
             var_name = self.ask_question.ask_question(
                 "Please enter the name of the variable: ",
                 "str"
@@ -393,6 +518,7 @@ Output:
 
     def ask_for_env_to_unset(self) -> int:
         """ Ask for the variable that needs to be removed from the environement """
+        self.flush_output()
         var_name = self.ask_question.ask_question(
             "Please enter the name of the variable: ",
             "ascii"
@@ -616,12 +742,12 @@ Here are the different status colours:
             self.help_prompt()
             self.current_tty_status = self.success
             return self.current_tty_status
-        for item in self.options:
-            if usr_input == list(item)[0]:
-                self.help_function_child_name = usr_input
-                item[usr_input](args[1:])
-                self.current_tty_status = self.success
-                return self.current_tty_status
+        function = self.options.get_function(usr_input)
+        if function is not None:
+            self.help_function_child_name = usr_input
+            function(args[1:])
+            self.current_tty_status = self.success
+            return self.current_tty_status
         self.print_on_tty(
             self.error_colour,
             f"Invalid option: {str(args[0])}\n"
@@ -644,20 +770,24 @@ Here are the different status colours:
             self.current_tty_status = global_status
             return global_status
         self.print_on_tty(self.reset_colour, "Available commands:\n")
-        if self.options is None:
+        if self.options is None or len(self.options) == 0:
             self.print_on_tty(self.reset_colour, "No commands available")
             self.current_tty_status = self.success
             return self.current_tty_status
-        for items in self.options:
-            for option in items:
-                self.print_on_tty(self.env_term_colour, option)
-                self.print_on_tty(self.env_shell_colour, ": ")
+        for option in self.options:
+            self.print_on_tty(self.env_term_colour, option)
+            aliases = self.options.get_aliases(option)
+            if len(aliases) > 0:
                 self.print_on_tty(
-                    self.env_definition_colour,
-                    items["desc"]
+                    self.env_shell_colour,
+                    f" ({', '.join(aliases)})"
                 )
-                self.print_on_tty(self.env_definition_colour, "\n")
-                break
+            self.print_on_tty(self.env_shell_colour, ": ")
+            self.print_on_tty(
+                self.env_definition_colour,
+                self.options.get_description(option)
+            )
+            self.print_on_tty(self.env_definition_colour, "\n")
         self.print_on_tty(self.default_colour, "\n")
         self.current_tty_status = self.success
         return self.current_tty_status
@@ -773,6 +903,7 @@ Output:
         self.print_on_tty(self.reset_colour, "Welcome to 'mkdir'\n")
         arg_length = len(args)
         if arg_length == 0:
+            self.flush_output()
             dir_name = self.ask_question.ask_question(
                 "Please enter the name of the directory: ",
                 "ascii"
@@ -895,6 +1026,7 @@ Output:
         self.print_on_tty(self.default_colour, "Welcome to Touch\n")
         arg_length = len(arg)
         if arg_length == 0:
+            self.flush_output()
             file_name = self.ask_question.ask_question(
                 "Please enter the name of the file: ",
                 "ascii"
@@ -972,6 +1104,7 @@ Output:
         self.print_on_tty(self.default_colour, "Welcome to 'rmdir'\n")
         arg_length = len(args)
         if arg_length == 0:
+            self.flush_output()
             dir_name = self.ask_question.ask_question(
                 "Please enter the name of the directory: ",
                 "ascii"
@@ -1001,6 +1134,7 @@ Output:
             if os.path.isfile(path):
                 os.remove(path)
             else:
+                self.flush_output()
                 response = self.ask_question.ask_question(
                     f"Are you sure you wish to remove folder {path} and all it's content? [(Y)es/(N)o]",
                     "bool"
@@ -1066,6 +1200,7 @@ Output:
         self.print_on_tty(self.default_colour, "Welcome to 'rm'\n")
         arg_length = len(args)
         if arg_length == 0:
+            self.flush_output()
             file_name = self.ask_question.ask_question(
                 "Please enter the name of the file or directory: ",
                 "ascii"
@@ -1208,6 +1343,7 @@ Output:
             self.current_tty_status = self.success
             return self.success
         self.print_on_tty(self.default_colour, "")
+        self.flush_output()
         sys.exit(self.current_tty_status)
 
     def display_status_in_prompt(self) -> None:
@@ -1220,35 +1356,125 @@ Output:
             self.print_on_tty(self.error_colour, "~")
         self.print_on_tty(self.default_colour, " ")
 
+    def start_history_search(self, original: str = "") -> None:
+        """ Enter the reverse incremental search, 'original' is the text restored if the search is cancelled """
+        self.history_search_active = True
+        self.history_search_text = ""
+        self.history_search_match = None
+        self.history_search_number = None
+        self.history_search_original = original
+
+    def update_history_search(self, text: str) -> Optional[str]:
+        """
+        Find the newest command containing the searched text (the search index avoids scanning the whole history).
+        None is returned if no command matches (or if the searched text is empty).
+        """
+        self.history_search_text = text
+        self.history_search_number = None
+        self.history_search_match = None
+        if text == "":
+            return None
+        result = self.history.search(text)
+        if result is None:
+            return None
+        self.history_search_number, self.history_search_match = result
+        return self.history_search_match
+
+    def search_older_history(self) -> Optional[str]:
+        """ Find the next older command containing the searched text (the current match is kept if there is none) """
+        if self.history_search_number is None:
+            return self.update_history_search(self.history_search_text)
+        result = self.history.search(
+            self.history_search_text,
+            self.history_search_number
+        )
+        if result is None:
+            return None
+        self.history_search_number, self.history_search_match = result
+        return self.history_search_match
+
+    def stop_history_search(self, accept: bool = True) -> str:
+        """ Leave the reverse incremental search, the text to put in the prompt is returned (the match, or the original text if the search was cancelled) """
+        self.history_search_active = False
+        if accept is True and self.history_search_match is not None:
+            return self.history_search_match
+        return self.history_search_original
+
+    def get_history_search_message(self) -> str:
+        """ Return the text displayed in front of the prompt (the searched text while searching) """
+        if self.history_search_active is False:
+            return ""
+        if self.history_search_text != "" and self.history_search_match is None:
+            return f"(failing reverse-i-search)`{self.history_search_text}': "
+        return f"(reverse-i-search)`{self.history_search_text}': "
+
     def create_key_prompt_bindings(self) -> None:
         """ Set up the functions in charge of changing the prompt with the content of the history command """
         bindings = KeyBindings()
+        searching = Condition(lambda: self.history_search_active)
+
+        def _show(buffer, text: str) -> None:
+            buffer.text = text
+            buffer.cursor_position = len(text)
 
-        @bindings.add('up')
+        @bindings.add('c-r')
         def _(event):
-            if self.history_index > 0:
-                self.history_index -= 1
-                self.user_session.default_buffer.text = self.history[self.history_index]
+            buffer = event.current_buffer
+            if self.history_search_active is False:
+                self.start_history_search(buffer.text)
+                return
+            match = self.search_older_history()
+            if match is not None:
+                _show(buffer, match)
+
+        def _leave_search(event):
+            """ End the search on the match and let the key keep it's usual meaning """
+            _show(event.current_buffer, self.stop_history_search())
+            event.app.key_processor.feed(event.key_sequence[0], first=True)
+
+        for key in ('left', 'right', 'up', 'down', 'home', 'end', 'delete', 'tab', 'c-a', 'c-e', 'c-b', 'c-f', 'c-p', 'c-n', 'c-k', 'c-u', 'c-w'):
+            bindings.add(key, filter=searching)(_leave_search)
+
+        @bindings.add('<any>', filter=searching)
+        def _(event):
+            if len(event.data) != 1 or not event.data.isprintable():
+                _leave_search(event)
+                return
+            match = self.update_history_search(self.history_search_text + event.data)
+            if match is not None:
+                _show(event.current_buffer, match)
+
+        @bindings.add('backspace', filter=searching)
+        def _(event):
+            match = self.update_history_search(self.history_search_text[:-1])
+            if match is None:
+                match = self.history_search_original
+            _show(event.current_buffer, match)
 
-        @bindings.add('down')
+        @bindings.add('escape', filter=searching)
+        @bindings.add('c-g', filter=searching)
         def _(event):
-            if self.history_index < len(self.history):
-                self.history_index += 1
-                if self.history_index == len(self.history):
-                    self.user_session.default_buffer.reset()
-                else:
-                    self.user_session.default_buffer.text = self.history[self.history_index]
+            _show(event.current_buffer, self.stop_history_search(False))
+
+        @bindings.add('enter', filter=searching)
+        def _(event):
+            _show(event.current_buffer, self.stop_history_search())
+            event.current_buffer.validate_and_handle()
 
         self.user_session = prompt_toolkit.PromptSession(
+            message=self.get_history_search_message,
             complete_while_typing=True,
             validate_while_typing=True,
             enable_history_search=True,
             key_bindings=bindings,
-            history=self.history
+            history=self.prompt_history,
+            completer=self.command_completer
         )
 
     def process_key_inputs(self) -> str:
         """ act depending on the special keys pressed or if entered is pressed """
+        self.flush_output()
+        self.history_search_active = False
         try:
             self.user_input = self.user_session.prompt()
         except KeyboardInterrupt:
@@ -1273,21 +1499,89 @@ Output:
         func_name = "ls"
         if self.help_function_child_name in (func_name, "dir"):
             help_description = f"""
-Display the content of the current working directory.
+Display the content of the current working directory (or of the passed in paths).
+Options:
+    -1: only display the names, one per line
+    -j N, --jobs N: stat the entries with N threads (faster on network file systems)
+    -R: list the sub directories as well
+    -L N, --max-depth N: do not show the entries more than N levels below the path
+    --exclude PATTERN: hide (and do not enter) the entries matching the pattern (i.e. '*.pyc')
+    --glob PATTERN: only show the entries matching the pattern (i.e. '*.log')
+    -t: sort by modification time (newest first)
+    -S: sort by size (biggest first)
+    -r: reverse the order
+    --head N: only show the first N entries
+    --no-cache: read the directories again even if their listing is cached
 Usage Example:
 Input:
     {self.help_function_child_name}
 Output:
     The content of the current working directory
+Input:
+    {self.help_function_child_name} -1 /tmp
+Output:
+    The names of the files contained in /tmp
+Input:
+    {self.help_function_child_name} -t --head 20 --glob '*.log' /var/log
+Output:
+    The 20 most recently modified log files
 """
             self.function_help(self.help_function_child_name, help_description)
             self.current_tty_status = self.success
             return self.success
-        if len(args) >= 1:
-            status = self.ls.ls(args[0])
-            self.current_tty_status = status
-            return status
-        status = self.ls.ls(".")
+        try:
+            options, paths = self.ls.parse_options(args)
+        except ValueError as err:
+            self.print_on_tty(self.error_colour, f"{err}\n")
+            self.current_tty_status = self.error
+            return self.error
+        self.flush_output()
+        if len(paths) > 1:
+            status = self.ls.ls(paths, options)
+        elif len(paths) == 1:
+            status = self.ls.ls(paths[0], options)
+        else:
+            status = self.ls.ls(".", options)
+        self.current_tty_status = status
+        return status
+
+    def bind_tree(self, args: List) -> int:
+        """ Bind the tree function of the ls implementation to the tree command """
+        func_name = "tree"
+        if self.help_function_child_name == func_name:
+            help_description = f"""
+Display the content of a directory (the current one by default) and of it's sub directories as a tree.
+Options:
+    -L N, --max-depth N: do not show the entries more than N levels below the path
+    --exclude PATTERN: hide (and do not enter) the entries matching the pattern (i.e. '.git')
+Usage Example:
+Input:
+    {func_name} -L 1
+Output:
+    .
+    ├── a_directory
+    └── a_file
+
+    1 directory, 1 file
+"""
+            self.function_help(func_name, help_description)
+            self.current_tty_status = self.success
+            return self.success
+        try:
+            options, paths = self.ls.parse_options(args, TREE_OPTIONS)
+        except ValueError as err:
+            self.print_on_tty(self.error_colour, f"{err}\n")
+            self.current_tty_status = self.error
+            return self.error
+        if len(paths) > 1:
+            self.print_on_tty(self.error_colour, "Invalid number of arguments\n")
+            self.current_tty_status = self.error
+            return self.error
+        self.flush_output()
+        path = "."
+        if len(paths) == 1:
+            path = paths[0]
+        status = self.ls.tree(path, options)
         self.current_tty_status = status
         return status
 
@@ -1531,26 +1825,76 @@ Output:
 
     def process_input(self) -> None:
         """ The function in charge of processing the user input """
-        if self.user_input == "":
+        self.process_line(self.user_input)
+
+    def process_line(self, line: str, record_history: bool = True) -> None:
+        """ Parse and run a line of text (the line can contain several commands) """
+        if line == "":
             self.current_tty_status = self.success
             return
-        self.history.append(self.user_input)
-        cleaned_command = self.user_input.split(self.comment_token)[0]
-        command = cleaned_command.split(self.input_split_char)
-        args = command[1:]
-        command = command[0].lower()
-        was_found = False
-        for item in self.options:
-            if self.is_exactly_in_string(list(item)[0], command) is True:
-                item[command](args)
-                was_found = True
-                break
-        if was_found is False:
+        if record_history is True:
+            self.history.append(line)
+        commands = self.parse_cache.get(
+            line,
+            self.command_seperator_token,
+            self.comment_token
+        )
+        if len(commands) == 0:
+            self.current_tty_status = self.success
+            return
+        self.run_parsed_commands(commands)
+
+    def execute(self, line: str, record_history: bool = False) -> ExecutionResult:
+        """
+        Run a line without rendering anything on the terminal.
+        The text displayed by the commands is returned (without colours) along with the status and the time it took.
+        """
+        capture_sink = MemorySink(0)
+        previous_sink = self.set_output_sink(capture_sink)
+        start = time.perf_counter()
+        try:
+            self.process_line(line, record_history)
+        finally:
+            duration = time.perf_counter() - start
+            self.set_output_sink(previous_sink)
+        return ExecutionResult(
+            line,
+            self.current_tty_status,
+            capture_sink.getvalue(),
+            capture_sink.get_errors(),
+            duration
+        )
+
+    def run_parsed_command(self, parsed_command: ParsedCommand) -> int:
+        """ Run a command that was produced by the tokenizer """
+        command = parsed_command.command.lower()
+        function = self.options.get_function(command)
+        if function is None:
             self.print_on_tty(
                 self.error_colour,
                 f"Invalid option: {str(command)}\n"
             )
             self.current_tty_status = self.err
+            return self.current_tty_status
+        self.help_function_child_name = "help"
+        use_pager = self.can_use_pager()
+        if use_pager:
+            self.start_output_spool()
+        self.output_buffer_depth += 1
+        try:
+            function(list(parsed_command.args))
+        finally:
+            self.output_buffer_depth -= 1
+            if use_pager:
+                self.stop_output_spool()
+            else:
+                self.flush_output()
+        return self.current_tty_status
+
+    def run_parsed_commands(self, commands: Union[List[ParsedCommand], Tuple[ParsedCommand, ...]]) -> None:
+        """ Run the commands that were produced by the tokenizer one after the other """
+        for parsed_command in commands:
+            self.run_parsed_command(parsed_command)
 
     def assing_colours(self) -> None:
         """ assing the colours to the variables in charge of managing the displays"""
@@ -1586,6 +1930,18 @@ Output:
         self.env_definition_colour = self.tty_colours["env_definition_colour"]
         self.session_name_colour = self.tty_colours["session_name_colour"]
 
+    def build_colour_escapes(self) -> None:
+        """ Resolve the escape sequence of every configured colour once so that displaying a text is a simple concatenation """
+        self.output_is_tty = self.output_sink.isatty()
+        self.colour_escapes = {}
+        if self.tty_colours is None:
+            return
+        for colour in self.tty_colours.values():
+            self.colour_escapes[colour] = self.colour_lib.unix_colour_pallet.get(
+                colour,
+                ""
+            )
+
     def command_seperator(self, args: List) -> int:
         """ Display/Change the token in charge of indicating the beginning of a new command when many are put together """
         func_name = "command_seperator"
@@ -1640,6 +1996,8 @@ Output:
             self.command_seperator_token = prev_seperator
             self.current_tty_status = self.error
             return self.error
+        self.command_completer.command_seperator_token = self.command_seperator_token
+        self.parse_cache.clear()
         self.print_on_tty(
             self.success_colour,
             f"The command seperator has be changed from '{prev_seperator}' to '{self.command_seperator_token}'.\n"
@@ -1690,9 +2048,10 @@ Output:
                 self.error_colour,
                 "Error: The seperator cannot be empty or contain only blanks/tabs"
             )
-            self.command_seperator_token = prev_token
+            self.comment_token = prev_token
             self.current_tty_status = self.error
             return self.error
+        self.parse_cache.clear()
         self.print_on_tty(
             self.success_colour,
             f"The comment token has be changed from '{prev_token}' to '{self.comment_token}'.\n"
@@ -1700,6 +2059,145 @@ Output:
         self.current_tty_status = self.success
         return self.success
 
+    def run_script(self, file_path: str) -> int:
+        """ Run the commands contained in a script file (the compiled script is cached on the disk) """
+        real_path = os.path.realpath(file_path)
+        if real_path in self.running_scripts:
+            self.print_on_tty(
+                self.error_colour,
+                f"Script '{file_path}' is already running (a script cannot source itself)\n"
+            )
+            self.current_tty_status = self.error
+            return self.error
+        try:
+            plan, _ = self.script_cache.get_plan(
+                file_path,
+                self.command_seperator_token,
+                self.comment_token
+            )
+        except (OSError, UnicodeDecodeError) as err:
+            self.print_on_tty(
+                self.error_colour,
+                f"Script '{file_path}' could not be read\n{err}\n"
+            )
+            self.current_tty_status = self.error
+            return self.error
+        global_status = self.success
+        self.running_scripts.add(real_path)
+        try:
+            for parsed_command in plan:
+                if self.continue_tty_loop is False:
+                    break
+                status = self.run_parsed_command(parsed_command)
+                if status != self.success:
+                    global_status = status
+        finally:
+            self.running_scripts.discard(real_path)
+        self.current_tty_status = global_status
+        return global_status
+
+    def source(self, args: List) -> int:
+        """ Run the commands contained in one or more script files """
+        func_name = "source"
+        if self.help_function_child_name in (func_name, "."):
+            help_description = f"""
+Run the commands contained in a file, one line after the other.
+The lines follow the same rules as the prompt (command seperators and comments are supported).
+The compiled version of the file is cached so that running the same file again skips the parsing.
+Usage Example:
+Input:
+    {self.help_function_child_name} deploy.tty
+Output:
+    The output of the commands contained in deploy.tty
+Input (the file does not exist):
+    {self.help_function_child_name} missing.tty
+Output:
+    Script 'missing.tty' could not be read
+"""
+            self.function_help(self.help_function_child_name, help_description)
+            self.current_tty_status = self.success
+            return self.success
+        if len(args) == 0:
+            self.print_on_tty(
+                self.error_colour,
+                "You need to specify a file to run\n"
+            )
+            self.current_tty_status = self.error
+            return self.error
+        global_status = self.success
+        for file_path in args:
+            if self.continue_tty_loop is False:
+                break
+            status = self.run_script(file_path)
+            if status != self.success:
+                global_status = status
+        self.current_tty_status = global_status
+        return global_status
+
+    def parse_cache_statistics(self, args: List) -> int:
+        """ Display/Reset the statistics of the cache containing the parsed lines """
+        func_name = "parse_cache"
+        if self.help_function_child_name == func_name:
+            help_description = f"""
+Display the statistics of the cache in charge of remembering the lines that were already parsed.
+If 'clear' is passed, the cached lines are removed.
+If 'reset' is passed, the statistics are reset.
+Usage Example:
+Input:
+    {func_name}
+Output:
+    Cached lines: 3/256
+    Hits: 12
+    Misses: 3
+    Hit rate: 80.00%
+Input:
+    {func_name} clear
+Output:
+    The parse cache has been cleared.
+"""
+            self.function_help(func_name, help_description)
+            self.current_tty_status = self.success
+            return self.success
+        if len(args) > 0 and args[0] == "clear":
+            self.parse_cache.clear()
+            self.print_on_tty(
+                self.success_colour,
+                "The parse cache has been cleared.\n"
+            )
+            self.current_tty_status = self.success
+            return self.success
+        if len(args) > 0 and args[0] == "reset":
+            self.parse_cache.reset_statistics()
+            self.print_on_tty(
+                self.success_colour,
+                "The parse cache statistics have been reset.\n"
+            )
+            self.current_tty_status = self.success
+            return self.success
+        if len(args) > 0:
+            self.print_on_tty(
+                self.error_colour,
+                f"Invalid option: {args[0]}\n"
+            )
+            self.current_tty_status = self.error
+            return self.error
+        self.print_on_tty(self.default_colour, "Cached lines: ")
+        self.print_on_tty(
+            self.success_colour,
+            f"{len(self.parse_cache)}/{self.parse_cache.max_entries}\n"
+        )
+        self.print_on_tty(self.default_colour, "Hits: ")
+        self.print_on_tty(self.success_colour, f"{self.parse_cache.hits}\n")
+        self.print_on_tty(self.default_colour, "Misses: ")
+        self.print_on_tty(self.success_colour, f"{self.parse_cache.misses}\n")
+        self.print_on_tty(self.default_colour, "Hit rate: ")
+        self.print_on_tty(
+            self.success_colour,
+            f"{self.parse_cache.hit_rate() * 100:.2f}%\n"
+        )
+        self.current_tty_status = self.success
+        return self.success
+
     def title(self) -> None:
         """ The boot tile """
         if self.continue_tty_loop is False:
@@ -1732,10 +2230,8 @@ Output:
             self.home = os.getcwd()
 
     def commands_to_auto_complete(self) -> None:
-        """ Convert the available commands to a list so that it can be used for command auto-completion """
-        for i in self.options:
-            for b in i:
-                self.auto_complete_list.append(b)
+        """ Rebuild the command auto-completion index from the available commands """
+        self.command_completer.rebuild()
 
     def load_basics(self) -> None:
         """ set the values for the variables that can be configured by the user """
@@ -1743,137 +2239,157 @@ Output:
         self.get_the_home_path()
         self.assing_colours()
         self.colour_lib.init_pallet()
-        self.options = [
-            {
-                "help": self.help,
-                self.command_description_token_inner: "Display this help section"
-            },
-            {
-                "man": self.help,
-                self.command_description_token_inner: "Display this help section"
-            },
-            {
-                ".help": self.help,
-                self.command_description_token_inner: "Display this help section"
-            },
-            {".h": self.help, self.command_description_token_inner: "Display this help section"},
-            {"/?": self.help, self.command_description_token_inner: "Display this help section"},
-            {"-h": self.help, self.command_description_token_inner: "Display this help section"},
-            {
-                "--h": self.help,
-                self.command_description_token_inner: "Display this help section"
-            },
-            {
-                "-help": self.help,
-                self.command_description_token_inner: "Display this help section"
-            },
-            {
-                "--help": self.help,
-                self.command_description_token_inner: "Display this help section"
-            },
-            {
-                "setenv": self.setenv,
-                self.command_description_token_inner: "Set a variable in the environement"
-            },
-            {
-                "unsetenv": self.unsetenv,
-                self.command_description_token_inner: "Remove a variable from the environement"
-            },
-            {
-                "exit": self.exit,
-                self.command_description_token_inner: "Close the current menu"
-            },
-            {
-                "abort": self.kill,
-                self.command_description_token_inner: "Exit the program (This will kill the program and any child processes)"
-            },
-            {
-                "hello_world": self.hello_world,
-                self.command_description_token_inner: "Display a Hello World"
-            },
-            {"env": self.env, self.command_description_token_inner: "Display the environement variables"},
-            {
-                "env++": self.env_plus_plus,
-                self.command_description_token_inner: "Display the environement variables using different colours"
-            },
-            {
-                "?": self.display_status_code,
-                self.command_description_token_inner: "Display the status code of the last function called"
-            },
-            {
-                "cd": self.change_directory,
-                self.command_description_token_inner: "Change the current working directory"
-            },
-            {
-                "pwd": self.pwd, self.command_description_token_inner:
-                "Display the path to the directory in wich we are located"
-            },
-            {
-                "version": self.version,
-                self.command_description_token_inner: "Display the current version of the program"
-            },
-            {
-                "author": self.author,
-                self.command_description_token_inner: "Display the author of the program"
-            },
-            {
-                "session_name": self.process_session_name,
-                self.command_description_token_inner: "Change the name of the current session"
-            },
-            {
-                "client": self.client,
-                self.command_description_token_inner: "Display the client of the program"
-            },
-            {
-                "history": self.show_history,
-                self.command_description_token_inner: "Display the previous commands that were run"
-            },
-            {
-                "ls": self.bind_ls, self.command_description_token_inner:
-                "List all files in the current folder"
-            },
-            {
-                "dir": self.bind_ls, self.command_description_token_inner:
-                "List all files in the current folder"
-            },
-            {
-                "mkdir": self.make_directory,
-                self.command_description_token_inner: "Create a directory in the present path"
-            },
-            {
-                "touch": self.touch,
-                self.command_description_token_inner: "Create a file in the present path"
-            },
-            {
-                "rm": self.remove_file,
-                self.command_description_token_inner: "Remove a file or directory if present in the path"
-            },
-            {
-                "rmdir": self.remove_directory,
-                self.command_description_token_inner: "Remove a directory if present in the path"
-            },
-            {
-                "run": self.run_command,
-                self.command_description_token_inner: "Run a command in the system terminal"
-            },
-            {
-                "is_admin": self.check_admin,
-                self.command_description_token_inner: "Return True if the system has elevated privileges."
-            },
-            {
-                "super_run": self.run_as_admin,
-                self.command_description_token_inner: "Run a command using elevated privileges"
-            },
-            {
-                "command_seperator": self.command_seperator,
-                self.command_description_token_inner: "Display/Change the token in charge of indicating the beginning of a new command when many are put together"
-            },
-            {
-                "comment_token": self.update_comment_token,
-                self.command_description_token_inner: "Display/Change the token in charge of indicating the beginning of a new command when many are put together"
-            }
-        ]
-        self.commands_to_auto_complete()
+        self.build_colour_escapes()
+        self.options.clear()
+        self.options.description_token = self.command_description_token_inner
+        self.options.add_command(
+            self.help_help_options[0],
+            self.help,
+            "Display this help section",
+            self.help_help_options[1:]
+        )
+        self.options.add_command(
+            "setenv",
+            self.setenv,
+            "Set a variable in the environement"
+        )
+        self.options.add_command(
+            "unsetenv",
+            self.unsetenv,
+            "Remove a variable from the environement"
+        )
+        self.options.add_command(
+            "exit",
+            self.exit,
+            "Close the current menu"
+        )
+        self.options.add_command(
+            "abort",
+            self.kill,
+            "Exit the program (This will kill the program and any child processes)"
+        )
+        self.options.add_command(
+            "hello_world",
+            self.hello_world,
+            "Display a Hello World"
+        )
+        self.options.add_command(
+            "env",
+            self.env,
+            "Display the environement variables"
+        )
+        self.options.add_command(
+            "env++",
+            self.env_plus_plus,
+            "Display the environement variables using different colours"
+        )
+        self.options.add_command(
+            "?",
+            self.display_status_code,
+            "Display the status code of the last function called"
+        )
+        self.options.add_command(
+            "cd",
+            self.change_directory,
+            "Change the current working directory"
+        )
+        self.options.add_command(
+            "pwd",
+            self.pwd,
+            "Display the path to the directory in wich we are located"
+        )
+        self.options.add_command(
+            "version",
+            self.version,
+            "Display the current version of the program"
+        )
+        self.options.add_command(
+            "author",
+            self.author,
+            "Display the author of the program"
+        )
+        self.options.add_command(
+            "session_name",
+            self.process_session_name,
+            "Change the name of the current session"
+        )
+        self.options.add_command(
+            "client",
+            self.client,
+            "Display the client of the program"
+        )
+        self.options.add_command(
+            "history",
+            self.show_history,
+            "Display the previous commands that were run"
+        )
+        self.options.add_command(
+            "ls",
+            self.bind_ls,
+            "List all files in the current folder",
+            ["dir"]
+        )
+        self.options.add_command(
+            "tree",
+            self.bind_tree,
+            "Display the content of a folder and of it's sub folders as a tree"
+        )
+        self.options.add_command(
+            "mkdir",
+            self.make_directory,
+            "Create a directory in the present path"
+        )
+        self.options.add_command(
+            "touch",
+            self.touch,
+            "Create a file in the present path"
+        )
+        self.options.add_command(
+            "rm",
+            self.remove_file,
+            "Remove a file or directory if present in the path"
+        )
+        self.options.add_command(
+            "rmdir",
+            self.remove_directory,
+            "Remove a directory if present in the path"
+        )
+        self.options.add_command(
+            "run",
+            self.run_command,
+            "Run a command in the system terminal"
+        )
+        self.options.add_command(
+            "is_admin",
+            self.check_admin,
+            "Return True if the system has elevated privileges."
+        )
+        self.options.add_command(
+            "super_run",
+            self.run_as_admin,
+            "Run a command using elevated privileges"
+        )
+        self.options.add_command(
+            "command_seperator",
+            self.command_seperator,
+            "Display/Change the token in charge of indicating the beginning of a new command when many are put together"
+        )
+        self.options.add_command(
+            "comment_token",
+            self.update_comment_token,
+            "Display/Change the token in charge of indicating the beginning of a new command when many are put together"
+        )
+        self.options.add_command(
+            "source",
+            self.source,
+            "Run the commands contained in a file",
+            ["."]
+        )
+        self.options.add_command(
+            "parse_cache",
+            self.parse_cache_statistics,
+            "Display the statistics of the cache containing the lines that were already parsed"
+        )
 
     def unload_basics(self) -> int:
         """ Free the ressources that were previously allocated """
@@ -1893,55 +2409,114 @@ Output:
         self.env_definition_colour = None
         self.session_name_colour = None
         self.tty_colours = None
-        self.options = []
-        self.auto_complete_list = []
+        self.colour_escapes = {}
+        self.options.clear()
+        self.history.close()
         return self.colour_lib.unload_ressources()
 
-    def import_functions_into_shell(self, functions: List[Dict[str, any]]) -> int:
-        """ Import functions into the shell """
-        for function in functions:
-            if function is None or isinstance(function, Dict) != True:
-                continue
-            if "desc" not in function:
-                function["desc"] = "No description provided\n"
-            self.options.append(function)
-            item = list(function)[0]
-            self.auto_complete_list.append(item)
+    def report_name_conflicts(self, names: List[str], conflicts: List[str], replace: bool) -> None:
+        """ Tell the user which names an import replaced (or skipped because they are already in use) """
+        if replace is True and len(conflicts) > 0:
             self.print_on_tty(
-                self.success_colour,
-                f"Added function {item}\n"
+                self.error_colour,
+                f"Replaced name(s) {conflicts}\n"
+            )
+            return
+        skipped = [i for i in names if i in conflicts]
+        if len(skipped) > 0:
+            self.print_on_tty(
+                self.error_colour,
+                f"Skipped name(s) {skipped} (already in use, import with replace=True to override them)\n"
             )
+
+    def import_functions_into_shell(self, functions: List[Dict[str, any]], replace: bool = False) -> int:
+        """ Import functions into the shell (the existing commands are only replaced if replace is True) """
+        names = self.options.get_names(functions)
+        conflicts = self.options.get_conflicts(names)
+        added = self.options.add_many(functions, replace=replace)
+        self.print_on_tty(
+            self.success_colour,
+            f"Added {len(added)} function(s)\n"
+        )
+        self.report_name_conflicts(names, conflicts, replace)
         self.current_tty_status = self.success
         return self.success
 
-    def remove_function_from_options(self, function: Dict[str, any]) -> int:
+    def remove_function_from_options(self, function: str) -> int:
         """ Remove a function from the options """
-        for function_item in self.options:
-            for index, item in enumerate(function_item):
-                if item == function:
-                    self.options.pop(index)
-                    self.auto_complete_list.pop(index)
-                    self.print_on_tty(self.success, f"Removed function {item}")
-                    self.current_tty_status = self.success
-                    return self.current_tty_status
+        removed = self.options.remove_command(function)
+        if len(removed) > 0:
+            self.print_on_tty(
+                self.success_colour,
+                f"Removed function {function}\n"
+            )
+            self.current_tty_status = self.success
+            return self.current_tty_status
         self.print_on_tty(
             self.error_colour,
-            f"Failed to remove function {item}"
+            f"Failed to remove function {function}\n"
         )
         self.current_tty_status = self.error
         return self.current_tty_status
 
     def remove_functions_from_shell(self, functions: List[Dict[str, any]]) -> int:
         """ Remove functions from the shell """
-        global_status = self.success
-        for function in functions:
-            for item in function:
-                status = self.remove_function_from_options(item)
-                if status != self.success:
-                    global_status = status
-        self.current_tty_status = global_status
+        names = list(dict.fromkeys(self.options.get_names(functions)))
+        missing = [i for i in names if i not in self.options]
+        removed = set(self.options.remove_many(names))
+        self.print_on_tty(
+            self.success_colour,
+            f"Removed {len([i for i in names if i in removed])} function(s)\n"
+        )
+        if len(missing) > 0:
+            self.print_on_tty(
+                self.error_colour,
+                f"Failed to remove function(s) {missing}\n"
+            )
+            self.current_tty_status = self.error
+            return self.current_tty_status
+        self.current_tty_status = self.success
         return self.current_tty_status
 
+    def import_plugin(self, plugin_name: str, functions: Union[List[Dict[str, any]], Dict[str, Callable]], replace: bool = False) -> int:
+        """
+        Import (or hot-swap) all the functions of a plugin in a single batch.
+        The functions can be a list of option dictionaries or a namespace in the form {"name": function}.
+        The commands that do not belong to the plugin (i.e. the builtins) are only replaced if replace is True.
+        """
+        removed = self.options.unregister_plugin(plugin_name)
+        names = self.options.get_names(functions)
+        conflicts = self.options.get_conflicts(names, plugin_name)
+        added = self.options.register_plugin(plugin_name, functions, replace)
+        kept = set(added)
+        replaced = [i for i in removed if i in kept]
+        summary = f"Plugin '{plugin_name}': {len(added) - len(replaced)} function(s) added"
+        if len(replaced) > 0:
+            summary += f", {len(replaced)} replaced"
+        if len(removed) > len(replaced):
+            summary += f", {len(removed) - len(replaced)} removed"
+        self.print_on_tty(self.success_colour, f"{summary}\n")
+        self.report_name_conflicts(names, conflicts, replace)
+        self.current_tty_status = self.success
+        return self.success
+
+    def remove_plugin(self, plugin_name: str) -> int:
+        """ Remove all the functions that a plugin imported in a single batch """
+        if plugin_name not in self.options.plugins:
+            self.print_on_tty(
+                self.error_colour,
+                f"Plugin '{plugin_name}' is not loaded\n"
+            )
+            self.current_tty_status = self.error
+            return self.error
+        removed = self.options.unregister_plugin(plugin_name)
+        self.print_on_tty(
+            self.success_colour,
+            f"Plugin '{plugin_name}': {len(removed)} function(s) removed\n"
+        )
+        self.current_tty_status = self.success
+        return self.success
+
     def goodbye_message(self) -> None:
         """ Display a goodbye message on the exit of the main terminal """
         goodbye_message = "Goodbye, see you next time !\n"
@@ -1960,34 +2535,25 @@ Output:
 
     def process_complex_input(self, usr_input: List) -> None:
         """ process multiple command input if provided """
-        command_list = []
-        buffer = ""
-        prev = ""
-        for item in usr_input:
-            if self.command_seperator_token == item:
-                command_list.append(buffer)
-                prev = item
-                buffer = ""
-                continue
-            if prev in (self.command_seperator_token, ""):
-                buffer += f"{item}"
-                prev = item
-                continue
-            if buffer != " ":
-                buffer += f" {item}"
-                prev = item
-        if buffer != "":
-            command_list.append(buffer)
-        self.run_complex_input(command_list)
+        if len(usr_input) == 0:
+            return
+        self.history.append(self.list_to_str(usr_input))
+        commands = tokenize_words(
+            usr_input,
+            self.command_seperator_token,
+            self.comment_token
+        )
+        self.run_parsed_commands(commands)
 
     def process_if_arg_input(self) -> None:
         """ Check if the argv contains arguments input """
+        if len(sys.argv) > 2 and sys.argv[1] in ("-f", "--file"):
+            self.source(sys.argv[2:])
+            if self.continue_tty_loop is True:
+                self.exit([])
+            return
         if len(sys.argv) > 1:
-            if self.command_seperator_token in sys.argv:
-                self.process_complex_input(sys.argv[1:])
-            else:
-                self.user_input = " ".join(sys.argv[1:])
-                self.process_input()
+            self.process_complex_input(sys.argv[1:])
             if self.continue_tty_loop is True:
                 self.print_on_tty(
                     self.default_colour,
@@ -1995,25 +2561,56 @@ Output:
                 )
 
     def clean_string(self, input_string: str) -> str:
-        """ remove enclosing string from the run string """
-        if len(input_string) > 0:
-            if input_string[0] == '"':
-                input_string = input_string[1:]
-            if input_string[-1] == '"':
-                input_string = input_string[:-1]
-            if input_string[-2] == '"':
-                input_string = input_string[:-2]+input_string[-1:]
-            if input_string[-3] == '"':
-                input_string = input_string[:-3]+input_string[-2:]
-        return input_string
+        """
+        remove enclosing string from the run string (i.e. echo "ls -l" | python -m tty_ov on Windows)
+        The quotes are only removed when the whole line is a single quoted token, the other quotes are left to the tokenizer.
+        """
+        body = input_string.rstrip("\r\n")
+        line_ending = input_string[len(body):]
+        if len(body) > 1 and body[0] == '"' and body[-1] == '"' and '"' not in body[1:-1]:
+            body = body[1:-1]
+        return body + line_ending
+
+    def skip_stream_line(self, stream: TextIO) -> None:
+        """ Discard the rest of the line that is being read from a stream """
+        while True:
+            chunk = stream.readline(self.pipe_max_line_length)
+            if chunk == "" or chunk[-1] == "\n":
+                return
+
+    def process_stream_input(self, stream: TextIO) -> int:
+        """
+        Run the commands contained in a stream line by line, each line is run as soon as it has been read.
+        Only one line is held in memory at a time and the lines longer than pipe_max_line_length are skipped.
+        """
+        global_status = self.success
+        line_number = 0
+        while self.continue_tty_loop is True:
+            line = stream.readline(self.pipe_max_line_length)
+            if line == "":
+                break
+            line_number += 1
+            if line[-1] != "\n" and len(line) >= self.pipe_max_line_length:
+                self.skip_stream_line(stream)
+                self.print_on_tty(
+                    self.error_colour,
+                    f"Line {line_number} is longer than {self.pipe_max_line_length} characters, skipped\n"
+                )
+                self.current_tty_status = self.error
+                global_status = self.error
+                continue
+            self.process_line(
+                self.clean_string(line.rstrip("\r\n")),
+                self.record_pipe_history
+            )
+            if self.current_tty_status != self.success:
+                global_status = self.current_tty_status
+        return global_status
 
     def process_if_pipe_input(self) -> None:
         """ Check if the user input is a pipe input """
         if not sys.stdin.isatty():
-            user_input = sys.stdin.read()
-            user_input = self.clean_string(user_input)
-            user_args = user_input.split(self.input_split_char)
-            self.process_complex_input(user_args)
+            self.process_stream_input(sys.stdin)
             if self.continue_tty_loop is True:
                 self.exit([])
 
@@ -2023,14 +2620,17 @@ Output:
         self.process_if_arg_input()
         self.process_if_pipe_input()
         self.title()
+        if self.continue_tty_loop is True:
+            self.create_key_prompt_bindings()
         while self.continue_tty_loop is True:
             self.help_function_child_name = "help"
             self.display_prompt()
-            seperated_commands = self.user_input.split(self.input_split_char)
-            self.process_complex_input(seperated_commands)
+            self.process_input()
         if self.session_name == "main":
             self.goodbye_message()
         self.print_on_tty(self.reset_colour, "")
+        self.flush_output()
+        self.history.close()
         return self.current_tty_status
 
 